@@ -0,0 +1,108 @@
+from datetime import date
+from itertools import accumulate, groupby
+
+from core import DATE_FORMAT
+
+
+PERIODS = ("day", "week", "month")
+
+
+def period_key(ordinal, period):
+    if period == "day":
+        return ordinal
+    if period == "week":
+        return ordinal - (ordinal - 1) % 7
+    if period == "month":
+        day = date.fromordinal(ordinal)
+        return day.year * 12 + day.month - 1
+    raise ValueError(f"Unknown period: {period}")
+
+
+def period_label(key, period):
+    if period == "day":
+        return date.fromordinal(key).strftime(DATE_FORMAT)
+    if period == "week":
+        year, week, _ = date.fromordinal(key).isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{key % 12 + 1:02d}/{key // 12}"
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class HistoryAnalytics:
+    def __init__(self, exercises, food):
+        self.columns = {"exercises": exercises, "food_intake": food}
+
+    @classmethod
+    def from_data_manager(cls, data_manager):
+        return cls(data_manager.get_exercise_columns(), data_manager.get_food_columns())
+
+    def _group_keys(self, columns, by):
+        if by == "name":
+            return columns.names, range(len(columns))
+        mapping = {ordinal: period_key(ordinal, by) for ordinal in set(columns.dates) if ordinal}
+        keys = list(map(mapping.get, columns.dates))
+        return keys, [i for i, key in enumerate(keys) if key is not None]
+
+    def _field(self, record_type, field):
+        columns = self.columns[record_type]
+        if field == "calories":
+            return columns, columns.calories
+        if field == "duration" and columns.has_duration:
+            return columns, columns.durations
+        raise ValueError(f"Unknown field for {record_type}: {field}")
+
+    def aggregate(self, record_type="exercises", by="day", field="calories", percentiles=(50, 90)):
+        columns, values = self._field(record_type, field)
+        keys, indices = self._group_keys(columns, by)
+        rows = []
+        for key, group in groupby(sorted(indices, key=keys.__getitem__), key=keys.__getitem__):
+            group_values = sorted(map(values.__getitem__, group))
+            total = sum(group_values)
+            row = {
+                "key": columns.strings[key] if by == "name" else period_label(key, by),
+                "count": len(group_values),
+                "sum": total,
+                "mean": total / len(group_values),
+                "min": group_values[0],
+                "max": group_values[-1]
+            }
+            for q in percentiles:
+                row[f"p{q}"] = percentile(group_values, q)
+            rows.append(row)
+        return rows
+
+    def daily_calories(self, record_type):
+        columns = self.columns[record_type]
+        totals = {}
+        for ordinal, calories in zip(columns.dates, columns.calories):
+            if ordinal:
+                totals[ordinal] = totals.get(ordinal, 0.0) + calories
+        return totals
+
+    def rolling_net_balance(self, window=7):
+        burned = self.daily_calories("exercises")
+        intake = self.daily_calories("food_intake")
+        days = burned.keys() | intake.keys()
+        if not days:
+            return []
+        ordinals = range(min(days), max(days) + 1)
+        net = [intake.get(o, 0.0) - burned.get(o, 0.0) for o in ordinals]
+        prefix = [0.0, *accumulate(net)]
+        return [
+            {
+                "date": date.fromordinal(ordinal).strftime(DATE_FORMAT),
+                "burned": burned.get(ordinal, 0.0),
+                "intake": intake.get(ordinal, 0.0),
+                "net": net[i],
+                "rolling_net": prefix[i + 1] - prefix[max(0, i + 1 - window)]
+            }
+            for i, ordinal in enumerate(ordinals)
+        ]
@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from core import (DATE_FORMAT, BinaryJournalStorage, BinaryStorage, DataExporter, DataManager, DayPartitionedStorage, Exercise,
+                  Food, JournalStorage, JsonStorage, PagedRowCache, SQLiteDataManager)
+
+
+ENGINES = {
+    "json": (".json", lambda path: JsonStorage(path, backups=0)),
+    "journal": (".json", lambda path: JournalStorage(path, backups=0)),
+    "binary": (".bin", lambda path: BinaryJournalStorage(path, backups=0)),
+    "days": (".json", lambda path: DayPartitionedStorage(path, backups=0)),
+    "sqlite": (".db", None)
+}
+SCREEN_ROWS = 25
+EXERCISE_NAMES = ["Running", "Cycling", "Swimming", "Walking", "Rowing", "Yoga", "Weights", "Hiking"]
+FOOD_NAMES = ["Oatmeal", "Chicken Salad", "Rice", "Apple", "Pasta", "Yogurt", "Sandwich", "Soup"]
+
+
+def synthetic_history(records, per_day=10, seed=42):
+    rng = random.Random(seed)
+    days = max(1, records // per_day)
+    start = date.today() - timedelta(days=days - 1)
+    data = DataManager.default_data()
+    for i in range(records):
+        day = (start + timedelta(days=min(i // per_day, days - 1))).strftime(DATE_FORMAT)
+        timestamp = f"{rng.randrange(6, 23):02d}:{rng.randrange(60):02d}"
+        if i % 2:
+            calories = round(rng.uniform(50, 900), 1)
+            data["food_intake"].append({"name": rng.choice(FOOD_NAMES), "calories": calories,
+                                        "date": day, "timestamp": timestamp})
+            data["total_calories_intake"] += calories
+        else:
+            calories = round(rng.uniform(50, 700), 1)
+            data["exercises"].append({"name": rng.choice(EXERCISE_NAMES), "duration": rng.randrange(5, 120),
+                                      "calories": calories, "date": day, "timestamp": timestamp})
+            data["total_calories_burned"] += calories
+    del data["daily_totals"], data["name_index"]  # derived indexes are rebuilt from the records on first use
+    return data
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_snapshot(records, repeat=3):
+    data = synthetic_history(records)
+    with tempfile.TemporaryDirectory() as directory:
+        json_file = os.path.join(directory, "history.json")
+        binary_file = os.path.join(directory, "history.bin")
+        JsonStorage(json_file, backups=0).save(data)
+        BinaryStorage(binary_file, backups=0).save(data)
+        return {
+            "records": records,
+            "json_bytes": os.path.getsize(json_file),
+            "binary_bytes": os.path.getsize(binary_file),
+            "json_load_s": best_of(lambda: DataManager(storage=JsonStorage(json_file)), repeat),
+            "binary_lazy_load_s": best_of(lambda: DataManager(storage=BinaryStorage(binary_file)), repeat),
+            "binary_full_load_s": best_of(lambda: DataManager(storage=BinaryStorage(binary_file, lazy=False)), repeat)
+        }
+
+
+def to_records(data):
+    for item in data["exercises"]:
+        yield Exercise(item["name"], item["duration"], item["calories"], item["date"], item["timestamp"])
+    for item in data["food_intake"]:
+        yield Food(item["name"], item["calories"], item["date"], item["timestamp"])
+
+
+def open_engine(engine, path):
+    storage = ENGINES[engine][1]
+    if storage is None:
+        return SQLiteDataManager(path)
+    return DataManager(path, storage=storage(path))
+
+
+def seed_engine(engine, path, data):
+    storage = ENGINES[engine][1]
+    if storage is not None:
+        storage(path).save(data)
+        return
+    data_manager = SQLiteDataManager(path)
+    try:
+        data_manager.bulk_add(to_records(data))
+    finally:
+        data_manager.close()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def per_op(fn, ops):
+    elapsed, _ = timed(lambda: [fn(i) for i in range(ops)])
+    return elapsed / ops
+
+
+def open_and_close(engine, path):
+    open_engine(engine, path).close()
+
+
+def format_screen(data_manager):
+    rows = PagedRowCache(data_manager.get_exercises_page, SCREEN_ROWS)
+    return rows.newest_first(0, SCREEN_ROWS, data_manager.count_exercises())
+
+
+def format_history(data_manager, page_size=1000):
+    rows = []
+    for offset in range(0, data_manager.count_exercises(), page_size):
+        rows.extend(record.get_summary() for record in data_manager.get_exercises_page(offset, page_size))
+    return rows
+
+
+def cold_get_exercises(engine, path, repeat=3):
+    # Lazy engines load their history on the first get_exercises call, so every repeat gets a fresh manager.
+    timings = []
+    for _ in range(repeat):
+        data_manager = open_engine(engine, path)
+        try:
+            elapsed, _ = timed(lambda: len(list(data_manager.get_exercises())))
+        finally:
+            data_manager.close()
+        timings.append(elapsed)
+    return min(timings)
+
+
+def bench_engine(engine, records, data, directory, repeat=3, ops=10):
+    path = os.path.join(directory, f"{engine}-{records}{ENGINES[engine][0]}")
+    seed_engine(engine, path, data)
+    today = date.today().strftime(DATE_FORMAT)
+    result = {
+        "engine": engine,
+        "records": records,
+        "file_bytes": os.path.getsize(path),
+        "load_s": best_of(lambda: open_and_close(engine, path), repeat)
+    }
+    data_manager = open_engine(engine, path)
+    try:
+        result["format_screen_s"] = best_of(lambda: format_screen(data_manager), repeat)
+        result["format_history_s"] = best_of(lambda: format_history(data_manager), repeat)
+        export_file = os.path.join(directory, f"{engine}-{records}.csv")
+        result["export_csv_s"] = best_of(lambda: DataExporter.export_csv(data_manager, export_file), repeat)
+    finally:
+        data_manager.close()
+    result["get_exercises_s"] = cold_get_exercises(engine, path, repeat)
+    data_manager = open_engine(engine, path)
+    try:
+        result["add_exercise_s"] = per_op(
+            lambda i: data_manager.add_exercise(Exercise(f"Bench {i}", 30, 250.0, today, "12:00")), ops)
+        result["add_food_s"] = per_op(lambda i: data_manager.add_food(Food(f"Bench {i}", 400.0, today, "12:00")), ops)
+        result["clear_exercises_s"], _ = timed(data_manager.clear_exercises)
+        result["clear_food_s"], _ = timed(data_manager.clear_food)
+    finally:
+        data_manager.close()
+    return result
+
+
+def bench_suite(sizes, engines=tuple(ENGINES), repeat=3, ops=10):
+    results = []
+    for records in sizes:
+        data = synthetic_history(records)
+        for engine in engines:
+            with tempfile.TemporaryDirectory() as directory:
+                results.append(bench_engine(engine, records, data, directory, repeat, ops))
+    return results
+
+
+def result_key(result):
+    return result.get("engine", "snapshot"), result["records"]
+
+
+def compare(results, baseline, threshold=1.2, noise=0.001):
+    previous = {result_key(result): result for result in baseline}
+    rows = []
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        for metric, value in result.items():
+            if not metric.endswith("_s") or not old.get(metric):
+                continue
+            ratio = value / old[metric]
+            rows.append({
+                "engine": result_key(result)[0],
+                "records": result["records"],
+                "metric": metric,
+                "baseline": old[metric],
+                "current": value,
+                "ratio": ratio,
+                "regression": ratio > threshold and value - old[metric] > noise
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tracker storage benchmarks.")
+    parser.add_argument("benchmark", choices=["snapshot", "suite"])
+    parser.add_argument("--records", type=int, nargs="+", help="history sizes (default: 1000 100000 1000000 for suite)")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ops", type=int, default=10, help="add_* calls timed per engine")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results previously written with --output")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    parser.add_argument("--noise", type=float, default=0.001, help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args(argv)
+    if args.benchmark == "snapshot":
+        results = [bench_snapshot(records, args.repeat) for records in args.records or [1000, 100000]]
+    else:
+        results = bench_suite(args.records or [1000, 100000, 1000000], args.engines, args.repeat, args.ops)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if not args.baseline:
+        print(json.dumps(results, indent=2))
+        return 0
+    with open(args.baseline, 'r') as f:
+        rows = compare(results, json.load(f), args.threshold, args.noise)
+    print(json.dumps({"results": results, "comparison": rows}, indent=2))
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
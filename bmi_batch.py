@@ -0,0 +1,34 @@
+import argparse
+import sys
+import time
+
+from core import BMICalculatorService, DataExporter
+from importer import open_input
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute BMI and category for every row of a roster CSV.")
+    parser.add_argument("source", help="roster CSV with height and weight columns, optionally .gz")
+    parser.add_argument("-o", "--output", help="output CSV (default: stdout); .gz output is compressed")
+    parser.add_argument("--height-column", default="height_cm")
+    parser.add_argument("--weight-column", default="weight_kg")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        with open_input(args.source) as source:
+            target = DataExporter.open_output(args.output) if args.output else sys.stdout
+            try:
+                total, invalid = BMICalculatorService.process_csv(source, target, args.height_column, args.weight_column)
+            finally:
+                if target is not sys.stdout:
+                    target.close()
+    except (OSError, ValueError) as e:
+        print(f"BMI batch failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Processed {total} rows ({invalid} invalid) in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
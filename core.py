@@ -0,0 +1,2618 @@
+from datetime import datetime, timedelta
+import csv
+import functools
+import gzip
+import heapq
+import json
+import math
+import mmap
+import os
+import queue
+import shutil
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from collections.abc import Sequence
+from itertools import islice
+from urllib.parse import quote, unquote
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class BaseRecord(ABC):
+    __slots__ = ("name", "calories", "date", "timestamp")
+
+    def __init__(self, name, calories, date, timestamp):
+        self.name = name
+        self.calories = calories
+        self.date = date
+        self.timestamp = timestamp
+
+    @abstractmethod
+    def to_dict(self):
+        pass
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data):
+        pass
+
+    @abstractmethod
+    def get_type(self):
+        pass
+
+    def get_summary(self):
+        return f"{self.timestamp} - {self.name}, {self.calories} calories"
+
+class Exercise(BaseRecord):
+    __slots__ = ("duration",)
+
+    def __init__(self, name, duration, calories, date, timestamp):
+        super().__init__(name, calories, date, timestamp)
+        self.duration = duration
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "duration": self.duration,
+            "calories": self.calories,
+            "date": self.date,
+            "timestamp": self.timestamp
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data.get("name", ""),
+            data.get("duration", 0),
+            data.get("calories", 0),
+            data.get("date", ""),
+            data.get("timestamp", "")
+        )
+
+    def get_type(self):
+        return "Exercise"
+
+    def get_summary(self):
+        return f"{self.timestamp} - {self.name}, {self.duration} min, {self.calories} calories"
+
+class Food(BaseRecord):
+    __slots__ = ()
+
+    def __init__(self, name, calories, date, timestamp):
+        super().__init__(name, calories, date, timestamp)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "calories": self.calories,
+            "date": self.date,
+            "timestamp": self.timestamp
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data.get("name", ""),
+            data.get("calories", 0),
+            data.get("date", ""),
+            data.get("timestamp", "")
+        )
+
+    def get_type(self):
+        return "Food"
+
+
+
+class RecordValidator:
+    @staticmethod
+    def _fields(*values):
+        return ["" if value is None else str(value).strip() for value in values]
+
+    @staticmethod
+    def _number(value):
+        number = float(value)
+        if not math.isfinite(number):
+            raise ValueError(value)
+        return number
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _formatted(value, fmt, message):
+        try:
+            return datetime.strptime(value, fmt).strftime(fmt)
+        except ValueError:
+            raise ValueError(message) from None
+
+    @staticmethod
+    def _when(date, timestamp):
+        date, timestamp = RecordValidator._fields(date, timestamp)
+        return (RecordValidator._formatted(date, DATE_FORMAT, "Date must be DD/MM/YYYY"),
+                RecordValidator._formatted(timestamp, "%H:%M", "Time must be HH:MM"))
+
+    @staticmethod
+    def parse_exercise(name, duration, calories, date, timestamp):
+        name, duration, calories = RecordValidator._fields(name, duration, calories)
+        if not name or not duration or not calories:
+            raise ValueError("Please fill in all fields")
+        try:
+            duration = RecordValidator._number(duration)
+            calories = RecordValidator._number(calories)
+        except ValueError:
+            raise ValueError("Duration and calories must be numbers") from None
+        if duration <= 0 or calories <= 0:
+            raise ValueError("Duration and calories must be positive numbers")
+        date, timestamp = RecordValidator._when(date, timestamp)
+        return Exercise(name, duration, calories, date, timestamp)
+
+    @staticmethod
+    def parse_food(name, calories, date, timestamp):
+        name, calories = RecordValidator._fields(name, calories)
+        if not name or not calories:
+            raise ValueError("Please fill in all fields")
+        try:
+            calories = RecordValidator._number(calories)
+        except ValueError:
+            raise ValueError("Calories must be a number") from None
+        if calories <= 0:
+            raise ValueError("Calories must be a positive number")
+        date, timestamp = RecordValidator._when(date, timestamp)
+        return Food(name, calories, date, timestamp)
+
+    @staticmethod
+    def validate(record):
+        if isinstance(record, Exercise):
+            return RecordValidator.parse_exercise(record.name, record.duration, record.calories, record.date, record.timestamp)
+        if isinstance(record, Food):
+            return RecordValidator.parse_food(record.name, record.calories, record.date, record.timestamp)
+        raise ValueError(f"Unsupported record: {record!r}")
+
+
+class RecordView(Sequence):
+    def __init__(self, records, version=0, generation=0):
+        self._records = records
+        self._length = len(records)
+        self.version = version
+        self.generation = generation
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._records[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("record index out of range")
+        return self._records[index]
+
+    def __iter__(self):
+        return islice(self._records, self._length)
+
+    def __reversed__(self):
+        for i in range(self._length - 1, -1, -1):
+            yield self._records[i]
+
+
+DATE_FORMAT = "%d/%m/%Y"
+
+
+def to_iso_day(date):
+    try:
+        return datetime.strptime(date, DATE_FORMAT).strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+cached_iso_day = functools.lru_cache(maxsize=8192)(to_iso_day)
+
+
+class RecordColumns(Sequence):
+    CALORIES_INT = 1
+    DURATION_INT = 2
+    HAS_RAW = 4
+    TIMES = [f"{minutes // 60:02d}:{minutes % 60:02d}" for minutes in range(24 * 60)]
+
+    def __init__(self, record_type=Exercise):
+        self.record_type = record_type
+        self.has_duration = record_type is Exercise
+        self.strings = []
+        self._string_ids = {}
+        self._date_codes = {}
+        self._date_strings = {}
+        self._time_codes = {}
+        self.names = array('I')
+        self.dates = array('i')
+        self.times = array('h')
+        self.calories = array('d')
+        self.durations = array('d')
+        self.flags = array('B')
+        self._raw = {}
+
+    @classmethod
+    def from_dicts(cls, record_type, items):
+        columns = cls(record_type)
+        for item in items:
+            columns.append_dict(item)
+        return columns
+
+    def _string_id(self, value):
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return string_id
+
+    def _date_code(self, value):
+        if not isinstance(value, str):
+            return 0
+        code = self._date_codes.get(value)
+        if code is None:
+            code = 0
+            # Canonical DD/MM/YYYY only, without the cost of strptime.
+            if len(value) == 10 and value[2] == value[5] == "/" and value.replace("/", "").isdigit() and value[6] != "0":
+                try:
+                    code = datetime(int(value[6:]), int(value[3:5]), int(value[:2])).toordinal()
+                except ValueError:
+                    pass
+            self._date_codes[value] = code
+            if code:
+                self._date_strings[code] = value
+        return code
+
+    @staticmethod
+    def _time_code(value):
+        if isinstance(value, str) and len(value) == 5 and value[2] == ":" and value[:2].isdigit() and value[3:].isdigit():
+            hours, minutes = int(value[:2]), int(value[3:])
+            if hours < 24 and minutes < 60:
+                return hours * 60 + minutes
+        return -1
+
+    @staticmethod
+    def _number(value):
+        if type(value) is float and value == value:
+            return value, False
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or float(value) != value:
+            return None, False
+        return float(value), isinstance(value, int)
+
+    def append(self, record):
+        self._append(record.name, record.duration if self.has_duration else 0, record.calories, record.date,
+                     record.timestamp)
+
+    def append_dict(self, item):
+        get = item.get
+        self._append(get("name", ""), get("duration", 0) if self.has_duration else 0, get("calories", 0),
+                     get("date", ""), get("timestamp", ""))
+
+    def _append(self, name, duration, calories, date, timestamp):
+        index = len(self.flags)
+        flags = 0
+        raw = {}
+        string_id = self._string_ids.get(name) if isinstance(name, str) else 0
+        if string_id is None:
+            string_id = self._string_id(name)
+        elif not isinstance(name, str):
+            raw["name"] = name
+        self.names.append(string_id)
+        code = self._date_codes.get(date) if isinstance(date, str) else 0
+        if code is None:
+            code = self._date_code(date)
+        self.dates.append(code)
+        if not code:
+            raw["date"] = date
+        minutes = self._time_codes.get(timestamp) if isinstance(timestamp, str) else -1
+        if minutes is None:
+            minutes = self._time_codes[timestamp] = self._time_code(timestamp)
+        self.times.append(minutes)
+        if minutes < 0:
+            raw["timestamp"] = timestamp
+        value, is_int = self._number(calories)
+        self.calories.append(value or 0.0)
+        if value is None:
+            raw["calories"] = calories
+        elif is_int:
+            flags |= self.CALORIES_INT
+        value, is_int = self._number(duration)
+        self.durations.append(value or 0.0)
+        if value is None:
+            raw["duration"] = duration
+        elif is_int:
+            flags |= self.DURATION_INT
+        if raw:
+            flags |= self.HAS_RAW
+            self._raw[index] = raw
+        self.flags.append(flags)
+
+    @classmethod
+    def from_records(cls, record_type, records):
+        columns = cls(record_type)
+        for record in records:
+            columns.append(record)
+        return columns
+
+    def __len__(self):
+        return len(self.flags)
+
+    def get_dict(self, index):
+        if index < 0:
+            index += len(self)
+        flags = self.flags[index]
+        calories = self.calories[index]
+        if flags & self.CALORIES_INT:
+            calories = int(calories)
+        item = {"name": self.strings[self.names[index]] if self.strings else ""}
+        if self.has_duration:
+            duration = self.durations[index]
+            item["duration"] = int(duration) if flags & self.DURATION_INT else duration
+        item["calories"] = calories
+        item["date"] = self._date_strings.get(self.dates[index], "")
+        minutes = self.times[index]
+        item["timestamp"] = self.TIMES[minutes] if minutes >= 0 else ""
+        if flags & self.HAS_RAW:
+            item.update(self._raw[index])
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.record_type.from_dict(self.get_dict(index))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_dicts(self):
+        return [record.to_dict() for record in self]
+
+
+class RecordDicts(Sequence):
+    """The to_dict() view storages persist, backed by RecordColumns so records are only held once in memory."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_dicts(cls, record_type, items):
+        return cls(RecordColumns.from_dicts(record_type, items))
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if not -len(self) <= index < len(self):
+            raise IndexError("record index out of range")
+        return self.columns.get_dict(index)
+
+    def __iter__(self):
+        return map(self.columns.get_dict, range(len(self)))
+
+    def __eq__(self, other):
+        if isinstance(other, (list, RecordDicts)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def append(self, item):
+        self.columns.append_dict(item)
+
+    def extend(self, items):
+        for item in items:
+            self.columns.append_dict(item)
+
+
+class DurabilityPolicy:
+    def __init__(self, every_writes=1, interval_ms=None):
+        self.every_writes = every_writes
+        self.interval_ms = interval_ms
+        self.writes = 0
+        self.last_sync = time.monotonic()
+
+    @classmethod
+    def always(cls):
+        return cls(every_writes=1)
+
+    @classmethod
+    def every(cls, writes):
+        return cls(every_writes=writes)
+
+    @classmethod
+    def interval(cls, milliseconds):
+        return cls(every_writes=None, interval_ms=milliseconds)
+
+    @classmethod
+    def never(cls):
+        return cls(every_writes=None)
+
+    def should_sync(self):
+        self.writes += 1
+        now = time.monotonic()
+        due = bool(self.every_writes) and self.writes >= self.every_writes
+        if self.interval_ms is not None and (now - self.last_sync) * 1000 >= self.interval_ms:
+            due = True
+        if due:
+            self.writes = 0
+            self.last_sync = now
+        return due
+
+
+class StorageLayoutError(OSError):
+    """The data file was written in a layout this storage cannot read without losing records."""
+
+
+class JsonStorage:
+    file_mode = ""
+
+    def __init__(self, data_file, durability=None, backups=1):
+        self.data_file = data_file
+        self.durability = durability or DurabilityPolicy()
+        self.backups = backups
+
+    def exists(self):
+        return os.path.exists(self.data_file)
+
+    def backup_file(self, generation):
+        return f"{self.data_file}.bak{generation}"
+
+    def load(self):
+        data = self._load_snapshot()
+        if isinstance(data, dict) and "days" in data:
+            raise StorageLayoutError(f"{self.data_file} holds day-partitioned history; open it with open_data_manager")
+        return data
+
+    def _load_snapshot(self):
+        try:
+            return self._load_file(self.data_file)
+        except (OSError, ValueError) as error:
+            for generation in range(1, self.backups + 1):
+                try:
+                    data = self._load_file(self.backup_file(generation))
+                except (OSError, ValueError):
+                    continue
+                print(f"Error loading data: {str(error)}; restored backup {self.backup_file(generation)}")
+                return data
+            raise
+
+    def _load_file(self, path):
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _dump(self, data, f):
+        json.dump(data, f, default=list)
+
+    def quarantine(self):
+        suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if os.path.exists(self.data_file):
+            os.replace(self.data_file, f"{self.data_file}.corrupt-{suffix}")
+
+    def pending_count(self, key):
+        return 0
+
+    def history_records(self, key):
+        return []
+
+    def history_between(self, key, start, end):
+        records = []
+        for record in self.history_records(key):
+            day = cached_iso_day(record.date) if isinstance(record.date, str) else None
+            if day is not None and start <= day <= end:
+                records.append(record)
+        return records
+
+    def load_history(self):
+        return {}
+
+    def discard_history(self, key):
+        pass
+
+    def replay(self):
+        return []
+
+    def save(self, data, sync=None):
+        if sync is None:
+            sync = self.durability.should_sync()
+        temp_file = self.data_file + ".tmp"
+        with open(temp_file, 'w' + self.file_mode) as f:
+            self._dump(data, f)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        self._rotate_backups()
+        os.replace(temp_file, self.data_file)
+        if sync:
+            self._sync_directory()
+
+    def _rotate_backups(self):
+        if not self.backups or not os.path.exists(self.data_file):
+            return
+        for generation in range(self.backups - 1, 0, -1):
+            if os.path.exists(self.backup_file(generation)):
+                os.replace(self.backup_file(generation), self.backup_file(generation + 1))
+        newest = self.backup_file(1)
+        if os.path.exists(newest):
+            os.remove(newest)
+        try:
+            os.link(self.data_file, newest)
+        except OSError:
+            shutil.copy2(self.data_file, newest)
+
+    def _sync_directory(self, directory=None):
+        try:
+            fd = os.open(directory or os.path.dirname(os.path.abspath(self.data_file)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def append(self, op, record, data):
+        self.save(data)
+
+    def append_many(self, entries, data):
+        self.save(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JournalStorage(JsonStorage):
+    def __init__(self, data_file, journal_file=None, compact_every=1000, durability=None, backups=1):
+        super().__init__(data_file, durability=durability, backups=backups)
+        self.journal_file = journal_file or data_file + ".journal"
+        self.compact_every = compact_every
+        self.seq = 0
+        self.pending = 0
+        self._journal = None
+
+    def exists(self):
+        return os.path.exists(self.data_file) or os.path.exists(self.journal_file)
+
+    def load(self):
+        self.seq = 0
+        if not os.path.exists(self.data_file):
+            return None
+        data = super().load()
+        self.seq = data.pop("journal_seq", 0)
+        return data
+
+    def replay(self):
+        if not os.path.exists(self.journal_file):
+            return
+        self.pending = 0
+        self._close_journal()
+        good = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn tail from an interrupted append: cut it off so later appends start on a fresh line.
+                    f.close()
+                    with open(self.journal_file, 'r+b') as journal:
+                        journal.truncate(good)
+                    break
+                good += len(line)
+                if entry["seq"] <= self.seq:
+                    continue
+                self.seq = entry["seq"]
+                self.pending += 1
+                yield entry["op"], entry.get("record")
+
+    def save(self, data, sync=None):
+        super().save(dict(data, journal_seq=self.seq), sync)
+        self._close_journal()
+        with open(self.journal_file, 'w'):
+            pass
+        self.pending = 0
+
+    def append(self, op, record, data):
+        self.append_many([(op, record)], data)
+
+    def append_many(self, entries, data):
+        if self.pending + len(entries) >= self.compact_every:
+            self.seq += len(entries)
+            self.save(data)
+            return
+        lines = []
+        for op, record in entries:
+            self.seq += 1
+            lines.append(json.dumps({"seq": self.seq, "op": op, "record": record}) + "\n")
+        if self._journal is None:
+            self._journal = open(self.journal_file, 'a')
+        start = self._journal.tell()
+        try:
+            self._journal.write("".join(lines))
+            self._journal.flush()
+            if self.durability.should_sync():
+                os.fsync(self._journal.fileno())
+        except Exception:
+            # Drop a partial write so a retry does not land on a torn line.
+            self._close_journal()
+            self.seq -= len(lines)
+            with open(self.journal_file, 'r+b') as journal:
+                journal.truncate(start)
+            raise
+        self.pending += len(lines)
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def quarantine(self):
+        suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
+        super().quarantine()
+        self._close_journal()
+        if os.path.exists(self.journal_file):
+            os.replace(self.journal_file, f"{self.journal_file}.corrupt-{suffix}")
+        self.seq = 0
+        self.pending = 0
+
+    def close(self):
+        self._close_journal()
+        super().close()
+
+
+class BinarySnapshot:
+    MAGIC = b"ETRKSNP1"
+    VERSION = 1
+    HEADER = struct.Struct("<8sHHQQQIQIQIQQ")
+    RECORD = struct.Struct("<IIIddB")
+    RUN = struct.Struct("<BIQQ")
+    TABLES = ("exercises", "food_intake")
+    CALORIES_INT = 1
+    DURATION_INT = 2
+    RAW = 4
+    COPY_CHUNK = 1 << 20
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, 'rb') as f:
+                fields = self.HEADER.unpack(f.read(self.HEADER.size))
+                (magic, version, _, exercise_count, food_count, strings_offset, strings_count,
+                 meta_offset, meta_length, index_offset, index_count, exercise_offset, food_offset) = fields
+                if magic != self.MAGIC or version != self.VERSION:
+                    raise ValueError(f"{path} is not a binary snapshot")
+                self.counts = {"exercises": exercise_count, "food_intake": food_count}
+                self.offsets = {"exercises": exercise_offset, "food_intake": food_offset}
+                f.seek(strings_offset)
+                self.strings = []
+                for _ in range(strings_count):
+                    length, = struct.unpack("<I", f.read(4))
+                    self.strings.append(f.read(length).decode("utf-8"))
+                f.seek(meta_offset)
+                self.meta = json.loads(f.read(meta_length).decode("utf-8"))
+                f.seek(index_offset)
+                self.runs = {key: [] for key in self.TABLES}
+                for table, date_id, start, count in self.RUN.iter_unpack(f.read(self.RUN.size * index_count)):
+                    self.runs[self.TABLES[table]].append((date_id, start, count))
+        except struct.error as e:
+            raise ValueError(f"{path} is truncated: {e}") from None
+        self.extras = self.meta.pop("extras", {})
+
+    def tail_start(self, key, date):
+        start = self.counts[key]
+        for date_id, run_start, _ in reversed(self.runs[key]):
+            if self.strings[date_id] != date:
+                break
+            start = run_start
+        return start
+
+    def read_raw(self, key, start, stop):
+        with open(self.path, 'rb') as f:
+            f.seek(self.offsets[key] + start * self.RECORD.size)
+            return f.read((stop - start) * self.RECORD.size)
+
+    def copy_raw(self, key, stop, out):
+        with open(self.path, 'rb') as f:
+            f.seek(self.offsets[key])
+            remaining = stop * self.RECORD.size
+            while remaining:
+                chunk = f.read(min(self.COPY_CHUNK, remaining))
+                if not chunk:
+                    raise ValueError(f"{self.path} is truncated")
+                out.write(chunk)
+                remaining -= len(chunk)
+
+    def decode(self, key, index, fields):
+        name_id, date_id, time_id, duration, calories, flags = fields
+        if flags & self.RAW:
+            return self.extras[key][str(index)]
+        strings = self.strings
+        if flags & self.CALORIES_INT:
+            calories = int(calories)
+        if key == "food_intake":
+            return {"name": strings[name_id], "calories": calories, "date": strings[date_id], "timestamp": strings[time_id]}
+        if flags & self.DURATION_INT:
+            duration = int(duration)
+        return {"name": strings[name_id], "duration": duration, "calories": calories,
+                "date": strings[date_id], "timestamp": strings[time_id]}
+
+    def read_records(self, key, start, stop):
+        raw = self.read_raw(key, start, stop)
+        if len(raw) != (stop - start) * self.RECORD.size:
+            raise ValueError(f"{self.path} is truncated")
+        return [self.decode(key, index, fields)
+                for index, fields in enumerate(self.RECORD.iter_unpack(raw), start)]
+
+    @classmethod
+    def _encodable(cls, key, item):
+        names = [item.get("name", ""), item.get("date", ""), item.get("timestamp", "")]
+        numbers = [item.get("calories", 0)] + ([item.get("duration", 0)] if key == "exercises" else [])
+        return (all(isinstance(value, str) for value in names)
+                and all(isinstance(value, (int, float)) and not isinstance(value, bool) and float(value) == value
+                        for value in numbers))
+
+    @classmethod
+    def write(cls, f, data, base=None, keep=None):
+        keep = keep or {}
+        strings = list(base.strings) if base else []
+        ids = {value: index for index, value in enumerate(strings)}
+
+        def string_id(value):
+            index = ids.get(value)
+            if index is None:
+                index = ids[value] = len(strings)
+                strings.append(value)
+            return index
+
+        f.write(b"\0" * cls.HEADER.size)
+        offsets, counts, runs, extras = {}, {}, [], {}
+        for table, key in enumerate(cls.TABLES):
+            offsets[key] = f.tell()
+            kept = keep.get(key, 0) if base else 0
+            table_extras = {}
+            if kept:
+                base.copy_raw(key, kept, f)
+                table_extras.update((index, item) for index, item in base.extras.get(key, {}).items() if int(index) < kept)
+                runs.extend((table, date_id, start, min(count, kept - start))
+                            for date_id, start, count in base.runs[key] if start < kept)
+            buffer = bytearray()
+            for index, item in enumerate(data.get(key, []), kept):
+                if cls._encodable(key, item):
+                    calories = item.get("calories", 0)
+                    duration = item.get("duration", 0) if key == "exercises" else 0
+                    flags = (cls.CALORIES_INT if isinstance(calories, int) else 0) | \
+                            (cls.DURATION_INT if isinstance(duration, int) else 0)
+                    date_id = string_id(item.get("date", ""))
+                    record = (string_id(item.get("name", "")), date_id, string_id(item.get("timestamp", "")),
+                              float(duration), float(calories), flags)
+                else:
+                    table_extras[str(index)] = item
+                    date_id = string_id(item["date"] if isinstance(item.get("date"), str) else "")
+                    record = (0, date_id, 0, 0.0, 0.0, cls.RAW)
+                buffer += cls.RECORD.pack(*record)
+                if runs and runs[-1][0] == table and runs[-1][1] == date_id and runs[-1][2] + runs[-1][3] == index:
+                    runs[-1] = (table, date_id, runs[-1][2], runs[-1][3] + 1)
+                else:
+                    runs.append((table, date_id, index, 1))
+            f.write(buffer)
+            counts[key] = kept + len(data.get(key, []))
+            if table_extras:
+                extras[key] = table_extras
+        strings_offset = f.tell()
+        f.write(b"".join(struct.pack("<I", len(encoded)) + encoded
+                         for encoded in (value.encode("utf-8") for value in strings)))
+        meta = {key: value for key, value in data.items() if key not in cls.TABLES}
+        if extras:
+            meta["extras"] = extras
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        meta_offset = f.tell()
+        f.write(meta_bytes)
+        index_offset = f.tell()
+        f.write(b"".join(cls.RUN.pack(*run) for run in runs))
+        f.seek(0)
+        f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, 0, counts["exercises"], counts["food_intake"],
+                                strings_offset, len(strings), meta_offset, len(meta_bytes),
+                                index_offset, len(runs), offsets["exercises"], offsets["food_intake"]))
+        f.seek(0, os.SEEK_END)
+
+
+class MappedRecords(Sequence):
+    CHUNK = 4096
+
+    def __init__(self, snapshot, key, stop=None):
+        self.snapshot = snapshot
+        self.key = key
+        self.record_type = Exercise if key == "exercises" else Food
+        self.length = snapshot.counts[key] if stop is None else stop
+        self.offset = snapshot.offsets[key]
+        with open(snapshot.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        if len(self._view) < self.offset + self.length * BinarySnapshot.RECORD.size:
+            self.close()
+            raise ValueError(f"{snapshot.path} is truncated")
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._map.close()
+            self._view = None
+
+    def __len__(self):
+        return self.length
+
+    def _record(self, index, fields):
+        return self.record_type.from_dict(self.snapshot.decode(self.key, index, fields))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("record index out of range")
+        fields = BinarySnapshot.RECORD.unpack_from(self._view, self.offset + index * BinarySnapshot.RECORD.size)
+        return self._record(index, fields)
+
+    def iter_fields(self):
+        size = BinarySnapshot.RECORD.size
+        for start in range(0, self.length, self.CHUNK):
+            stop = min(start + self.CHUNK, self.length)
+            with self._view[self.offset + start * size:self.offset + stop * size] as chunk:
+                rows = list(BinarySnapshot.RECORD.iter_unpack(chunk))
+            yield from enumerate(rows, start)
+
+    def __iter__(self):
+        for index, fields in self.iter_fields():
+            yield self._record(index, fields)
+
+
+class BinaryStorage(JsonStorage):
+    file_mode = "b"
+
+    def __init__(self, data_file, lazy=True, durability=None, backups=1):
+        super().__init__(data_file, durability, backups)
+        self.lazy = lazy
+        self.snapshot = None
+        self._pending = {}
+        self._mapped = {}
+
+    def _load_file(self, path):
+        snapshot = BinarySnapshot(path)
+        data = dict(snapshot.meta)
+        for key in BinarySnapshot.TABLES:
+            start = snapshot.tail_start(key, data.get("current_date")) if self.lazy else 0
+            data[key] = snapshot.read_records(key, start, snapshot.counts[key])
+            self._pending[key] = start
+        self.snapshot = snapshot
+        return data
+
+    def _dump(self, data, f):
+        BinarySnapshot.write(f, data, self.snapshot, self._pending)
+
+    def _close_mapped(self):
+        for mapped in self._mapped.values():
+            mapped.close()
+        self._mapped = {}
+
+    def save(self, data, sync=None):
+        self._close_mapped()
+        super().save(data, sync)
+        self.snapshot = BinarySnapshot(self.data_file) if any(self._pending.values()) else None
+
+    def quarantine(self):
+        self._close_mapped()
+        super().quarantine()
+        self.snapshot = None
+        self._pending = {}
+
+    def pending_count(self, key):
+        return self._pending.get(key, 0)
+
+    def history_records(self, key):
+        count = self.pending_count(key)
+        if not count:
+            return []
+        mapped = self._mapped.get(key)
+        if mapped is None:
+            mapped = self._mapped[key] = MappedRecords(self.snapshot, key, count)
+        return mapped
+
+    def load_history(self):
+        self._close_mapped()
+        history = {key: self.snapshot.read_records(key, 0, count)
+                   for key, count in self._pending.items() if count}
+        self._pending = {}
+        self.snapshot = None
+        return history
+
+    def discard_history(self, key):
+        mapped = self._mapped.pop(key, None)
+        if mapped is not None:
+            mapped.close()
+        self._pending[key] = 0
+
+    def close(self):
+        self._close_mapped()
+        super().close()
+
+
+class BinaryJournalStorage(JournalStorage, BinaryStorage):
+    def __init__(self, data_file, journal_file=None, compact_every=1000, lazy=True, durability=None, backups=1):
+        super().__init__(data_file, journal_file, compact_every, durability, backups)
+        self.lazy = lazy
+
+
+def convert_snapshot(source, target):
+    reader = BinaryStorage(source, lazy=False) if source.endswith(".bin") else JsonStorage(source)
+    writer = BinaryStorage(target, lazy=False) if target.endswith(".bin") else JsonStorage(target)
+    writer.save(reader.load())
+
+
+class DaySegments(Sequence):
+    def __init__(self, storage, key, start=None, end=None):
+        self.storage = storage
+        self.key = key
+        self.column = DayPartitionedStorage.TABLES.index(key)
+        self.record_type = Exercise if key == "exercises" else Food
+        self.segments = []
+        self.starts = []
+        self.length = 0
+        for name, counts in storage.cold.items():
+            if start is not None and (name == DayPartitionedStorage.UNDATED or not start <= name <= end):
+                continue
+            if counts[self.column]:
+                self.segments.append(name)
+                self.starts.append(self.length)
+                self.length += counts[self.column]
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            records = []
+            while start < stop:
+                position = bisect_right(self.starts, start) - 1
+                name = self.segments[position]
+                local = start - self.starts[position]
+                count = min(stop - start, self.storage.cold[name][self.column] - local)
+                items = self.storage.segment(name)[self.key][local:local + count]
+                records.extend(map(self.record_type.from_dict, items))
+                start += count
+            return records
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("record index out of range")
+        return self[index:index + 1][0]
+
+
+class DayPartitionedStorage(JournalStorage):
+    TABLES = ("exercises", "food_intake")
+    UNDATED = "undated"
+
+    def __init__(self, data_file, journal_file=None, compact_every=1000, durability=None, backups=1, cache_size=16):
+        super().__init__(data_file, journal_file, compact_every, durability, backups)
+        self.segment_dir = data_file + ".days"
+        self.cache_size = cache_size
+        self.days = {}
+        self.cold = {}
+        self.legacy = False
+        self._cleared = set()
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def segment_name(record):
+        return to_iso_day(record.get("date")) or DayPartitionedStorage.UNDATED
+
+    @staticmethod
+    def _order(name):
+        return name != DayPartitionedStorage.UNDATED, name
+
+    def segment_file(self, name):
+        return os.path.join(self.segment_dir, name + ".json")
+
+    def segment(self, name):
+        items = self._cache.get(name)
+        if items is not None:
+            self._cache.move_to_end(name)
+            return items
+        try:
+            with open(self.segment_file(name), 'r') as f:
+                items = json.load(f)
+        except FileNotFoundError:
+            items = {}
+        items = {key: items.get(key, [])[:count] for key, count in zip(self.TABLES, self.days.get(name, (0, 0)))}
+        self._cache[name] = items
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return items
+
+    def _load_file(self, path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        self._cache.clear()
+        self._cleared = set()
+        if "days" not in data:
+            self.legacy = True
+            self.days = {}
+            self.cold = {}
+            return data
+        self.legacy = False
+        self.days = {name: counts for name, counts in sorted(data.pop("days").items(), key=lambda item: self._order(item[0]))}
+        today = datetime.now().strftime("%Y-%m-%d")
+        self.cold = {name: list(counts) for name, counts in self.days.items() if name == self.UNDATED or name < today}
+        for key in self.TABLES:
+            data[key] = []
+        for name in self.days:
+            if name not in self.cold:
+                segment = self.segment(name)
+                for key in self.TABLES:
+                    data[key].extend(segment[key])
+        return data
+
+    def pending_count(self, key):
+        column = self.TABLES.index(key)
+        return sum(counts[column] for counts in self.cold.values())
+
+    def history_records(self, key):
+        return DaySegments(self, key)
+
+    def history_between(self, key, start, end):
+        return DaySegments(self, key, start, end)
+
+    def load_history(self):
+        history = {key: [] for key in self.TABLES}
+        for name in self.cold:
+            segment = self.segment(name)
+            for key in self.TABLES:
+                history[key].extend(segment[key])
+        self.cold = {}
+        self._cache.clear()
+        return {key: items for key, items in history.items() if items}
+
+    def discard_history(self, key):
+        column = self.TABLES.index(key)
+        for counts in self.cold.values():
+            counts[column] = 0
+        self._cleared.add(key)
+
+    def _write_segment(self, name, segment, sync):
+        path = self.segment_file(name)
+        with open(path + ".tmp", 'w') as f:
+            json.dump(segment, f)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def save(self, data, sync=None):
+        if sync is None:
+            sync = self.durability.should_sync()
+        groups = {}
+        for column, key in enumerate(self.TABLES):
+            for item in data.get(key, []):
+                name = self.segment_name(item)
+                group = groups.get(name)
+                if group is None:
+                    group = groups[name] = ([], [])
+                group[column].append(item)
+        os.makedirs(self.segment_dir, exist_ok=True)
+        days = {}
+        for name in sorted(groups.keys() | self.cold.keys(), key=self._order):
+            cold = self.cold.get(name, (0, 0))
+            group = groups.get(name, ([], []))
+            counts = [cold[column] + len(group[column]) for column in range(len(self.TABLES))]
+            if not any(counts):
+                continue
+            days[name] = counts
+            if counts == self.days.get(name) and not self._cleared:
+                continue
+            segment = self.segment(name) if any(cold) else {}
+            segment = {key: segment.get(key, [])[:cold[column]] + group[column] for column, key in enumerate(self.TABLES)}
+            self._write_segment(name, segment, sync)
+            self._cache.pop(name, None)
+        for name in self.days.keys() - days.keys():
+            if os.path.exists(self.segment_file(name)):
+                os.remove(self.segment_file(name))
+            self._cache.pop(name, None)
+        if sync:
+            self._sync_directory(self.segment_dir)
+        meta = {key: value for key, value in data.items() if key not in self.TABLES}
+        meta["days"] = days
+        super().save(meta, sync)
+        self.days = days
+        self.legacy = False
+        self._cleared = set()
+
+    def append_many(self, entries, data):
+        if self.legacy:
+            self.seq += len(entries)
+            self.save(data)
+            return
+        super().append_many(entries, data)
+
+    def quarantine(self):
+        suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
+        super().quarantine()
+        if os.path.isdir(self.segment_dir):
+            os.replace(self.segment_dir, f"{self.segment_dir}.corrupt-{suffix}")
+        self.days = {}
+        self.cold = {}
+        self._cleared = set()
+        self._cache.clear()
+
+
+class BackgroundStorage:
+    def __init__(self, storage, lock, latency=0.25):
+        self.storage = storage
+        self.lock = lock
+        self.latency = latency
+        self._queue = queue.Queue()
+        self._closed = False
+        self.error = None
+        self._failed = ([], None, False)
+        self._thread = threading.Thread(target=self._run, name="DataManagerWriter", daemon=True)
+        self._thread.start()
+
+    def exists(self):
+        return self.storage.exists()
+
+    def load(self):
+        return self.storage.load()
+
+    def replay(self):
+        return self.storage.replay()
+
+    def quarantine(self):
+        self.flush()
+        with self.lock:
+            self.storage.quarantine()
+
+    def pending_count(self, key):
+        return self.storage.pending_count(key)
+
+    def history_records(self, key):
+        return self.storage.history_records(key)
+
+    def history_between(self, key, start, end):
+        return self.storage.history_between(key, start, end)
+
+    def load_history(self):
+        return self.storage.load_history()
+
+    def discard_history(self, key):
+        self.storage.discard_history(key)
+
+    def save(self, data):
+        self._queue.put(("save", None, data))
+
+    def append(self, op, record, data):
+        self._queue.put((op, record, data))
+
+    def append_many(self, entries, data):
+        self._queue.put(("many", entries, data))
+
+    def flush(self):
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(("flush", done, None))
+        done.wait()
+        self._raise_error()
+
+    def close(self):
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(("close", done, None))
+        done.wait()
+        self._thread.join()
+        self._closed = True
+        self.storage.close()
+        self._raise_error()
+
+    def _raise_error(self):
+        # Writes that failed are kept and retried with the next batch; callers learn the data is not on disk yet.
+        if self.error is not None:
+            raise OSError(f"Changes could not be saved: {self.error}") from self.error
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.latency
+            while batch[-1][0] not in ("flush", "close"):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with self.lock:
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._write(batch)
+            for op, done, _ in batch:
+                if op in ("flush", "close"):
+                    done.set()
+            if any(op == "close" for op, _, _ in batch):
+                return
+
+    def _write(self, batch):
+        entries, data, snapshot = self._failed
+        for op, record, item_data in batch:
+            if op in ("flush", "close"):
+                continue
+            data = item_data
+            if op == "save":
+                snapshot = True
+            elif op == "many":
+                entries.extend(record)
+            else:
+                entries.append((op, record))
+        if data is None:
+            return
+        try:
+            if snapshot:
+                self.storage.save(data)
+            else:
+                self.storage.append_many(entries, data)
+        except Exception as e:
+            print(f"Error saving data: {str(e)}")
+            self._failed = (entries, data, snapshot)
+            self.error = e
+            return
+        self._failed = ([], None, False)
+        self.error = None
+
+
+class DailyTotalsIndex:
+    BURNED, INTAKE, DURATION = range(3)
+
+    def __init__(self, totals):
+        self.totals = totals
+        self._rebuild()
+
+    def _rebuild(self):
+        self.days = sorted(self.totals)
+        self.prefix = []
+        for column in range(3):
+            running = array('d', [0.0])
+            for day in self.days:
+                running.append(running[-1] + self.totals[day][column])
+            self.prefix.append(running)
+        self.dirty = False
+
+    def add(self, day, burned=0, intake=0, duration=0):
+        deltas = (burned, intake, duration)
+        row = self.totals.get(day)
+        new = row is None
+        if new:
+            row = self.totals[day] = [0, 0, 0]
+        for column, delta in enumerate(deltas):
+            row[column] += delta
+        if self.dirty:
+            return
+        if new and (not self.days or day > self.days[-1]):
+            self.days.append(day)
+            for column, delta in enumerate(deltas):
+                self.prefix[column].append(self.prefix[column][-1] + delta)
+        elif not new and day == self.days[-1]:
+            for column, delta in enumerate(deltas):
+                self.prefix[column][-1] += delta
+        else:
+            self.dirty = True
+
+    @staticmethod
+    def _number(value):
+        return value if isinstance(value, (int, float)) else 0
+
+    def add_record(self, key, record):
+        day = cached_iso_day(record.get("date"))
+        if day is None:
+            return
+        calories = self._number(record.get("calories"))
+        if key == "exercises":
+            self.add(day, burned=calories, duration=self._number(record.get("duration")))
+        else:
+            self.add(day, intake=calories)
+
+    def clear(self, key):
+        columns = (self.BURNED, self.DURATION) if key == "exercises" else (self.INTAKE,)
+        for day, row in list(self.totals.items()):
+            for column in columns:
+                row[column] = 0
+            if not any(row):
+                del self.totals[day]
+        self.dirty = True
+
+    def between(self, start, end):
+        if self.dirty:
+            self._rebuild()
+        lo = bisect_left(self.days, start)
+        hi = bisect_right(self.days, end)
+        return [prefix[hi] - prefix[lo] for prefix in self.prefix]
+
+    def rows(self, start, end):
+        if self.dirty:
+            self._rebuild()
+        return [(day, self.totals[day]) for day in self.days[bisect_left(self.days, start):bisect_right(self.days, end)]]
+
+
+class NameIndex:
+    def __init__(self, entries=None):
+        self.entries = {} if entries is None else entries
+        self.keys = sorted(self.entries)
+        self.seq = max((entry[2] for entry in self.entries.values()), default=0)
+
+    @staticmethod
+    def normalize(name):
+        return " ".join(name.split()).casefold()
+
+    @classmethod
+    def from_records(cls, records):
+        index = cls()
+        for record in records:
+            index.add(record, insert=False)
+        index.keys = sorted(index.entries)
+        return index
+
+    def add(self, record, insert=True):
+        name = record.get("name")
+        if not isinstance(name, str) or not name.strip():
+            return
+        key = self.normalize(name)
+        self.seq += 1
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = [name.strip(), 0, 0, None, None]
+            if insert:
+                insort(self.keys, key)
+        entry[0] = name.strip()
+        entry[1] += 1
+        entry[2] = self.seq
+        entry[3] = record.get("duration")
+        entry[4] = record.get("calories")
+
+    def suggest(self, prefix, limit=8):
+        prefix = self.normalize(prefix)
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        entries = self.entries
+        best = heapq.nlargest(limit, self.keys[lo:hi], key=lambda key: (entries[key][1], entries[key][2]))
+        return [entries[key][0] for key in best]
+
+    def last(self, name):
+        entry = self.entries.get(self.normalize(name))
+        if entry is None:
+            return None
+        return {"name": entry[0], "duration": entry[3], "calories": entry[4]}
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def parse_day_range(start, end):
+    start_day, end_day = to_iso_day(start), to_iso_day(end)
+    if start_day is None or end_day is None:
+        raise ValueError(f"Dates must use the {DATE_FORMAT} format")
+    return start_day, end_day
+
+
+def totals_result(burned, intake, duration):
+    return {"burned": burned, "intake": intake, "duration": duration, "net": intake - burned}
+
+
+def recent_range(current_date, days):
+    end = datetime.strptime(current_date, DATE_FORMAT)
+    try:
+        start = end - timedelta(days=max(1, days) - 1)
+    except OverflowError:
+        raise ValueError(f"Cannot go back {days} days from {current_date}") from None
+    return start.strftime(DATE_FORMAT), current_date
+
+
+class DataManager:
+    RECORD_TYPES = {"exercises": Exercise, "food_intake": Food}
+
+    def __init__(self, data_file="exercise_data.json", storage=None, background=False, flush_latency=0.25):
+        self.data_file = data_file
+        self.lock = threading.RLock()
+        self.storage = storage or JsonStorage(data_file)
+        self.versions = {key: 0 for key in self.RECORD_TYPES}
+        self.generations = {key: 0 for key in self.RECORD_TYPES}
+        self._day_totals = None
+        self._daily_index = None
+        self._name_indexes = {}
+        self.file_lock = None
+        self.data = self.default_data()
+        self.load_data()
+        if background:
+            self.storage = BackgroundStorage(self.storage, self.lock, flush_latency)
+        self.roll_over(persist=False)
+
+    @staticmethod
+    def default_data():
+        return {
+            "exercises": [],
+            "food_intake": [],
+            "total_calories_burned": 0,
+            "total_calories_intake": 0,
+            "current_date": datetime.now().strftime("%d/%m/%Y"),
+            "target_calories": 2000,
+            "activity_level": "Moderate",
+            "daily_totals": {},
+            "name_index": {key: {} for key in DataManager.RECORD_TYPES}
+        }
+
+    def save_data(self):
+        with self.lock:
+            self.storage.save(self.data)
+
+    def load_data(self):
+        if self.storage.exists():
+            try:
+                data = self.storage.load()
+                if data is not None:
+                    self.data = data
+                    self._invalidate(*self.RECORD_TYPES)
+                self._columnize()
+                for op, record in self.storage.replay():
+                    self._apply(op, record)
+            except StorageLayoutError:
+                raise
+            except Exception as e:
+                print(f"Error loading data: {str(e)}")
+                self.data = self.default_data()
+                self._invalidate(*self.RECORD_TYPES)
+                self.storage.quarantine()
+        self._columnize()
+
+    def _columnize(self):
+        # Storages hand back lists of dicts; keep them as columns and rebuild dicts only when persisting.
+        for key, cls in self.RECORD_TYPES.items():
+            if not isinstance(self.data.get(key), RecordDicts):
+                self.data[key] = RecordDicts.from_dicts(cls, self.data.get(key) or [])
+
+    def flush(self):
+        self.storage.flush()
+
+    def close(self):
+        try:
+            self.storage.close()
+        finally:
+            if self.file_lock is not None:
+                self.file_lock.release()
+                self.file_lock = None
+
+    def _invalidate(self, *keys):
+        self._day_totals = None
+        for key in keys:
+            self._name_indexes.pop(key, None)
+            self.versions[key] += 1
+            self.generations[key] += 1
+
+    def _append_record(self, key, record):
+        self._extend_records(key, [record])
+
+    def _extend_records(self, key, records):
+        self.data[key].extend(records)
+        index = self._totals_index(build=False)
+        if index is not None:
+            for record in records:
+                index.add_record(key, record)
+        names = self._name_index(key, build=False)
+        if names is not None:
+            for record in records:
+                names.add(record)
+        if self._day_totals is not None:
+            today = self.data.get("current_date")
+            self._day_totals[key] += sum(record["calories"] for record in records if record.get("date") == today)
+        self.versions[key] += 1
+
+    def _clear_records(self, key):
+        self.storage.discard_history(key)
+        self.data[key] = RecordDicts(RecordColumns(self.RECORD_TYPES[key]))
+        index = self._totals_index(build=False)
+        if index is not None:
+            index.clear(key)
+        self.data.setdefault("name_index", {})[key] = {}
+        self._name_indexes.pop(key, None)
+        if self._day_totals is not None:
+            self._day_totals[key] = 0
+        self.versions[key] += 1
+        self.generations[key] += 1
+
+    def has_pending_history(self):
+        return any(self.storage.pending_count(key) for key in self.RECORD_TYPES)
+
+    def load_history(self):
+        with self.lock:
+            for key, items in self.storage.load_history().items():
+                items.extend(self.data[key])
+                self.data[key] = RecordDicts.from_dicts(self.RECORD_TYPES[key], items)
+                self._invalidate(key)
+
+    def _ensure_history(self, key):
+        if self.storage.pending_count(key):
+            self.load_history()
+
+    def _columns(self, key):
+        self._ensure_history(key)
+        return self.data[key].columns
+
+    def _view(self, key):
+        return RecordView(self._columns(key), self.versions[key], self.generations[key])
+
+    def _apply(self, op, record=None):
+        if op == "add_exercise":
+            self._append_record("exercises", record)
+            self.data["total_calories_burned"] += record["calories"]
+        elif op == "add_food":
+            self._append_record("food_intake", record)
+            self.data["total_calories_intake"] += record["calories"]
+        elif op == "clear_exercises":
+            self._clear_records("exercises")
+            self.data["total_calories_burned"] = 0
+        elif op == "clear_food":
+            self._clear_records("food_intake")
+            self.data["total_calories_intake"] = 0
+        elif op == "reset_all":
+            self._apply("clear_exercises")
+            self._apply("clear_food")
+        elif op in ("set_target", "set_weight"):
+            self.data.update(record)
+        elif op == "set_date":
+            self.data.update(record)
+            self._day_totals = None
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+
+    def _commit(self, op, record=None):
+        with self.lock:
+            self._apply(op, record)
+            self.storage.append(op, record, self.data)
+
+    def get_exercises(self):
+        return self._view("exercises")
+
+    def get_food_intake(self):
+        return self._view("food_intake")
+
+    def _page(self, key, offset, limit):
+        with self.lock:
+            pending = self.storage.pending_count(key)
+            page = []
+            if offset < pending:
+                page = self.storage.history_records(key)[offset:min(offset + limit, pending)]
+                limit -= len(page)
+                offset = pending
+            if limit <= 0:
+                return page
+            return page + self.data[key].columns[offset - pending:offset - pending + limit]
+
+    def _iter_records(self, key, chunk_size=4096):
+        count = self.count_exercises() if key == "exercises" else self.count_food_intake()
+        for offset in range(0, count, chunk_size):
+            yield from self._page(key, offset, chunk_size)
+
+    def iter_exercises(self):
+        return self._iter_records("exercises")
+
+    def iter_food_intake(self):
+        return self._iter_records("food_intake")
+
+    def get_exercise_columns(self):
+        if self.storage.pending_count("exercises"):
+            return RecordColumns.from_records(Exercise, self.iter_exercises())
+        return self._columns("exercises")
+
+    def get_food_columns(self):
+        if self.storage.pending_count("food_intake"):
+            return RecordColumns.from_records(Food, self.iter_food_intake())
+        return self._columns("food_intake")
+
+    def count_exercises(self):
+        return len(self.data.get("exercises", [])) + self.storage.pending_count("exercises")
+
+    def count_food_intake(self):
+        return len(self.data.get("food_intake", [])) + self.storage.pending_count("food_intake")
+
+    def get_exercises_page(self, offset, limit):
+        return self._page("exercises", offset, limit)
+
+    def get_food_intake_page(self, offset, limit):
+        return self._page("food_intake", offset, limit)
+
+    def _between(self, key, start, end, offset=0, limit=None):
+        # Only the unloaded days inside the range are read, and only as far as the page needs.
+        start, end = parse_day_range(start, end)
+        first = datetime.strptime(start, "%Y-%m-%d").toordinal()
+        last = datetime.strptime(end, "%Y-%m-%d").toordinal()
+        with self.lock:
+            history = self.storage.history_between(key, start, end)
+            columns = self.data[key].columns
+            loaded = [i for i, day in enumerate(columns.dates) if first <= day <= last]
+            total = len(history) + len(loaded)
+            stop = total if limit is None else min(total, offset + limit)
+            page = list(history[offset:stop]) if offset < len(history) else []
+            page.extend(map(columns.__getitem__, loaded[max(0, offset - len(history)):max(0, stop - len(history))]))
+            return page, total
+
+    def get_exercises_between(self, start, end):
+        return self._between("exercises", start, end)[0]
+
+    def get_exercises_between_page(self, start, end, offset, limit):
+        return self._between("exercises", start, end, offset, limit)
+
+    def _name_index(self, key, build=True):
+        # Persisted next to daily_totals so opening a profile never walks the cold history;
+        # files written before the index existed build it once, on first use.
+        indexes = self.data.setdefault("name_index", {})
+        entries = indexes.get(key)
+        if entries is None:
+            if not build:
+                return None
+            names = NameIndex.from_records(record.to_dict() for record in self._iter_records(key))
+            indexes[key] = names.entries
+            self._name_indexes[key] = names
+        names = self._name_indexes.get(key)
+        if names is None or names.entries is not indexes[key]:
+            names = self._name_indexes[key] = NameIndex(indexes[key])
+        return names
+
+    def get_name_index(self, key):
+        with self.lock:
+            return self._name_index(key)
+
+    def get_name_suggestions(self, key, prefix, limit=8):
+        names = self.get_name_index(key)
+        with self.lock:
+            return names.suggest(prefix, limit)
+
+    def get_last_entry(self, key, name):
+        names = self.get_name_index(key)
+        with self.lock:
+            return names.last(name)
+
+    def _totals_index(self, build=True):
+        totals = self.data.get("daily_totals")
+        if totals is None:
+            if not build:
+                return None
+            totals = {}
+            index = DailyTotalsIndex(totals)
+            for key in self.RECORD_TYPES:
+                for record in self._iter_records(key):
+                    index.add_record(key, record.to_dict())
+            self.data["daily_totals"] = totals
+        if self._daily_index is None or self._daily_index.totals is not totals:
+            self._daily_index = DailyTotalsIndex(totals)
+        return self._daily_index
+
+    def get_totals_between(self, start, end):
+        start, end = parse_day_range(start, end)
+        with self.lock:
+            return totals_result(*self._totals_index().between(start, end))
+
+    def get_net_calories_between(self, start, end):
+        return self.get_totals_between(start, end)["net"]
+
+    def get_recent_totals(self, days=30):
+        return self.get_totals_between(*recent_range(self.get_current_date(), days))
+
+    def get_daily_totals(self, start, end):
+        start, end = parse_day_range(start, end)
+        with self.lock:
+            return [dict(totals_result(*row), date=datetime.strptime(day, "%Y-%m-%d").strftime(DATE_FORMAT))
+                    for day, row in self._totals_index().rows(start, end)]
+
+    def get_food_intake_between(self, start, end):
+        return self._between("food_intake", start, end)[0]
+
+    def get_food_intake_between_page(self, start, end, offset, limit):
+        return self._between("food_intake", start, end, offset, limit)
+
+    def add_exercise(self, exercise: Exercise):
+        self._commit("add_exercise", exercise.to_dict())
+
+    def add_food(self, food: Food):
+        self._commit("add_food", food.to_dict())
+
+    def bulk_add(self, records):
+        staged = {"exercises": [], "food_intake": []}
+        for index, record in enumerate(records, 1):
+            try:
+                record = RecordValidator.validate(record)
+            except ValueError as e:
+                raise ValueError(f"Record {index}: {e}") from None
+            staged["exercises" if isinstance(record, Exercise) else "food_intake"].append(record.to_dict())
+        entries = []
+        with self.lock:
+            for key, op, total in (("exercises", "add_exercise", "total_calories_burned"),
+                                   ("food_intake", "add_food", "total_calories_intake")):
+                items = staged[key]
+                if items:
+                    self._extend_records(key, items)
+                    self.data[total] += sum(item["calories"] for item in items)
+                    entries.extend((op, item) for item in items)
+            if entries:
+                self.storage.append_many(entries, self.data)
+        return len(entries)
+
+    def clear_exercises(self):
+        self._commit("clear_exercises")
+
+    def clear_food(self):
+        self._commit("clear_food")
+
+    def reset_all(self):
+        self._commit("reset_all")
+
+    def get_total_calories_burned(self):
+        return self.data.get("total_calories_burned", 0)
+
+    def get_total_calories_intake(self):
+        return self.data.get("total_calories_intake", 0)
+
+    def set_target_calories(self, target_calories, activity_level=None):
+        record = {"target_calories": target_calories}
+        if activity_level is not None:
+            record["activity_level"] = activity_level
+        self._commit("set_target", record)
+
+    def derive_target_calories(self, age, gender, weight_kg, height_cm, activity_level):
+        target = round(CalorieNeedsService.calculate_daily_calories(age, gender, weight_kg, height_cm, activity_level))
+        self.set_target_calories(target, activity_level)
+        self.set_weight(weight_kg)
+        return target
+
+    def set_weight(self, weight_kg):
+        weight = parse_measure(weight_kg)
+        if math.isnan(weight):
+            raise ValueError("Weight must be a positive number")
+        if weight != self.get_weight():
+            self._commit("set_weight", {"weight_kg": weight})
+
+    def get_weight(self):
+        return self.data.get("weight_kg")
+
+    def get_target_calories(self):
+        return self.data.get("target_calories", 2000)
+
+    def get_activity_level(self):
+        return self.data.get("activity_level", "Moderate")
+
+    def get_current_date(self):
+        return self.data.get("current_date", datetime.now().strftime("%d/%m/%Y"))
+
+    def roll_over(self, today=None, persist=True):
+        today = today or datetime.now().strftime(DATE_FORMAT)
+        if self.data.get("current_date") == today:
+            return False
+        if persist:
+            self._commit("set_date", {"current_date": today})
+        else:
+            self._apply("set_date", {"current_date": today})
+        return True
+
+    def _today_totals(self):
+        with self.lock:
+            if self._day_totals is None:
+                today = self.data.get("current_date")
+                self._day_totals = {
+                    key: sum(item["calories"] for item in self.data.get(key, []) if item.get("date") == today)
+                    for key in self.RECORD_TYPES
+                }
+            return self._day_totals
+
+    def get_today_calories_burned(self):
+        return self._today_totals()["exercises"]
+
+    def get_today_calories_intake(self):
+        return self._today_totals()["food_intake"]
+
+
+class SQLiteDataManager:
+    DEFAULT_SETTINGS = {
+        "total_calories_burned": 0,
+        "total_calories_intake": 0,
+        "target_calories": 2000,
+        "activity_level": "Moderate"
+    }
+
+    def __init__(self, data_file="exercise_data.db"):
+        self.data_file = data_file
+        self.conn = None
+        self.load_data()
+        self.roll_over()
+
+    def load_data(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.data_file)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS records (
+                    id INTEGER PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    duration REAL,
+                    calories REAL NOT NULL,
+                    date TEXT,
+                    timestamp TEXT,
+                    day TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_records_type_day ON records (type, day);
+                CREATE INDEX IF NOT EXISTS idx_records_type_name ON records (type, name);
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+            defaults = dict(self.DEFAULT_SETTINGS, current_date=datetime.now().strftime(DATE_FORMAT))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in defaults.items()]
+            )
+
+    def save_data(self):
+        self.conn.commit()
+
+    def flush(self):
+        if self.conn is not None:
+            self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _get_setting(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_setting(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _add_to_setting(self, key, amount):
+        self._set_setting(key, self._get_setting(key, 0) + amount)
+
+    def _query(self, record_type, start=None, end=None, offset=0, limit=None):
+        sql = "SELECT name, duration, calories, date, timestamp FROM records WHERE type = ?"
+        params = [record_type]
+        if start is not None or end is not None:
+            sql += " AND day BETWEEN ? AND ?"
+            params.extend(parse_day_range(start, end))
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend((limit, offset))
+        return self.conn.execute(sql, params)
+
+    def _insert(self, record_type, record):
+        self.conn.execute(
+            "INSERT INTO records (type, name, duration, calories, date, timestamp, day) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (record_type, record.name, getattr(record, "duration", None), record.calories,
+             record.date, record.timestamp, to_iso_day(record.date))
+        )
+
+    def get_exercises(self):
+        return [Exercise(*row) for row in self._query("Exercise")]
+
+    def get_food_intake(self):
+        return [Food(name, calories, date, timestamp) for name, _, calories, date, timestamp in self._query("Food")]
+
+    def _count(self, record_type):
+        return self.conn.execute("SELECT COUNT(*) FROM records WHERE type = ?", (record_type,)).fetchone()[0]
+
+    def _query_page(self, record_type, offset, limit):
+        return self.conn.execute(
+            "SELECT name, duration, calories, date, timestamp FROM records WHERE type = ? ORDER BY id LIMIT ? OFFSET ?",
+            (record_type, limit, offset)
+        )
+
+    def count_exercises(self):
+        return self._count("Exercise")
+
+    def count_food_intake(self):
+        return self._count("Food")
+
+    def get_exercises_page(self, offset, limit):
+        return [Exercise(*row) for row in self._query_page("Exercise", offset, limit)]
+
+    def get_food_intake_page(self, offset, limit):
+        return [Food(name, calories, date, timestamp)
+                for name, _, calories, date, timestamp in self._query_page("Food", offset, limit)]
+
+    def _iter_records(self, record_type, chunk_size=4096):
+        cursor = self._query(record_type)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            if record_type == "Exercise":
+                yield from (Exercise(*row) for row in rows)
+            else:
+                yield from (Food(name, calories, date, timestamp) for name, _, calories, date, timestamp in rows)
+
+    def iter_exercises(self):
+        return self._iter_records("Exercise")
+
+    def iter_food_intake(self):
+        return self._iter_records("Food")
+
+    def get_exercise_columns(self):
+        return RecordColumns.from_records(Exercise, self.iter_exercises())
+
+    def get_food_columns(self):
+        return RecordColumns.from_records(Food, self.iter_food_intake())
+
+    def get_totals_between(self, start, end):
+        start, end = parse_day_range(start, end)
+        totals = {}
+        for record_type in ("Exercise", "Food"):
+            totals[record_type] = self.conn.execute(
+                "SELECT COALESCE(SUM(calories), 0), COALESCE(SUM(duration), 0) FROM records "
+                "WHERE type = ? AND day BETWEEN ? AND ?", (record_type, start, end)
+            ).fetchone()
+        return totals_result(totals["Exercise"][0], totals["Food"][0], totals["Exercise"][1])
+
+    def get_net_calories_between(self, start, end):
+        return self.get_totals_between(start, end)["net"]
+
+    def get_recent_totals(self, days=30):
+        return self.get_totals_between(*recent_range(self.get_current_date(), days))
+
+    def get_daily_totals(self, start, end):
+        start, end = parse_day_range(start, end)
+        days = {}
+        for record_type in ("Exercise", "Food"):
+            for day, calories, duration in self.conn.execute(
+                    "SELECT day, SUM(calories), COALESCE(SUM(duration), 0) FROM records "
+                    "WHERE type = ? AND day BETWEEN ? AND ? GROUP BY day", (record_type, start, end)):
+                row = days.setdefault(day, [0, 0, 0])
+                if record_type == "Exercise":
+                    row[0], row[2] = calories, duration
+                else:
+                    row[1] = calories
+        return [dict(totals_result(*days[day]), date=datetime.strptime(day, "%Y-%m-%d").strftime(DATE_FORMAT))
+                for day in sorted(days)]
+
+    def get_exercises_between(self, start, end):
+        return [Exercise(*row) for row in self._query("Exercise", start, end)]
+
+    def get_food_intake_between(self, start, end):
+        return [Food(name, calories, date, timestamp)
+                for name, _, calories, date, timestamp in self._query("Food", start, end)]
+
+    def _count_between(self, record_type, start, end):
+        return self.conn.execute("SELECT COUNT(*) FROM records WHERE type = ? AND day BETWEEN ? AND ?",
+                                 (record_type, *parse_day_range(start, end))).fetchone()[0]
+
+    def get_exercises_between_page(self, start, end, offset, limit):
+        total = self._count_between("Exercise", start, end)
+        return [Exercise(*row) for row in self._query("Exercise", start, end, offset, limit)], total
+
+    def get_food_intake_between_page(self, start, end, offset, limit):
+        total = self._count_between("Food", start, end)
+        return [Food(name, calories, date, timestamp)
+                for name, _, calories, date, timestamp in self._query("Food", start, end, offset, limit)], total
+
+    def add_exercise(self, exercise: Exercise):
+        with self.conn:
+            self._insert("Exercise", exercise)
+            self._add_to_setting("total_calories_burned", exercise.calories)
+
+    def add_food(self, food: Food):
+        with self.conn:
+            self._insert("Food", food)
+            self._add_to_setting("total_calories_intake", food.calories)
+
+    def bulk_add(self, records):
+        rows = []
+        totals = {"Exercise": 0, "Food": 0}
+        for index, record in enumerate(records, 1):
+            try:
+                record = RecordValidator.validate(record)
+            except ValueError as e:
+                raise ValueError(f"Record {index}: {e}") from None
+            record_type = record.get_type()
+            rows.append((record_type, record.name, getattr(record, "duration", None), record.calories,
+                         record.date, record.timestamp, to_iso_day(record.date)))
+            totals[record_type] += record.calories
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO records (type, name, duration, calories, date, timestamp, day) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._add_to_setting("total_calories_burned", totals["Exercise"])
+            self._add_to_setting("total_calories_intake", totals["Food"])
+        return len(rows)
+
+    def clear_exercises(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM records WHERE type = 'Exercise'")
+            self._set_setting("total_calories_burned", 0)
+
+    def clear_food(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM records WHERE type = 'Food'")
+            self._set_setting("total_calories_intake", 0)
+
+    def reset_all(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM records")
+            self._set_setting("total_calories_burned", 0)
+            self._set_setting("total_calories_intake", 0)
+
+    def get_total_calories_burned(self):
+        return self._get_setting("total_calories_burned", 0)
+
+    def get_total_calories_intake(self):
+        return self._get_setting("total_calories_intake", 0)
+
+    def set_target_calories(self, target_calories, activity_level=None):
+        with self.conn:
+            self._set_setting("target_calories", target_calories)
+            if activity_level is not None:
+                self._set_setting("activity_level", activity_level)
+
+    def derive_target_calories(self, age, gender, weight_kg, height_cm, activity_level):
+        target = round(CalorieNeedsService.calculate_daily_calories(age, gender, weight_kg, height_cm, activity_level))
+        self.set_target_calories(target, activity_level)
+        self.set_weight(weight_kg)
+        return target
+
+    def set_weight(self, weight_kg):
+        weight = parse_measure(weight_kg)
+        if math.isnan(weight):
+            raise ValueError("Weight must be a positive number")
+        if weight == self.get_weight():
+            return
+        with self.conn:
+            self._set_setting("weight_kg", weight)
+
+    def get_weight(self):
+        return self._get_setting("weight_kg")
+
+    def get_target_calories(self):
+        return self._get_setting("target_calories", 2000)
+
+    def get_activity_level(self):
+        return self._get_setting("activity_level", "Moderate")
+
+    def get_current_date(self):
+        return self._get_setting("current_date", datetime.now().strftime(DATE_FORMAT))
+
+    def roll_over(self, today=None):
+        today = today or datetime.now().strftime(DATE_FORMAT)
+        if self.get_current_date() == today:
+            return False
+        with self.conn:
+            self._set_setting("current_date", today)
+        return True
+
+    def _today_total(self, record_type):
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(calories), 0) FROM records WHERE type = ? AND day = ?",
+            (record_type, to_iso_day(self.get_current_date()))
+        ).fetchone()
+        return row[0]
+
+    def get_today_calories_burned(self):
+        return self._today_total("Exercise")
+
+    def get_today_calories_intake(self):
+        return self._today_total("Food")
+
+
+class FileLock:
+    """Exclusive advisory lock so only one process writes a tracker's journal at a time."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        f = open(self.path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            raise OSError(f"Another tracker process is already using {self.path}") from None
+        self._file = f
+        return self
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def open_data_manager(data_file, background=False):
+    if data_file.endswith(".db"):
+        return SQLiteDataManager(data_file)
+    lock = FileLock(data_file + ".lock").acquire()
+    try:
+        data_manager = DataManager(data_file, storage=DayPartitionedStorage(data_file), background=background)
+    except BaseException:
+        lock.release()
+        raise
+    data_manager.file_lock = lock
+    return data_manager
+
+
+class ProfileManager:
+    DEFAULT_PROFILE = "Default"
+    SUFFIX = ".json"
+
+    def __init__(self, directory="profiles", capacity=8, default_file="exercise_data.json", factory=None):
+        self.directory = directory
+        self.capacity = max(1, capacity)
+        self.default_file = default_file
+        self.factory = factory or (lambda path: open_data_manager(path, background=True))
+        self.lock = threading.Lock()
+        self._open = OrderedDict()
+
+    @staticmethod
+    def normalize(name):
+        name = str(name).strip()
+        if not name:
+            raise ValueError("Profile name cannot be empty")
+        return name
+
+    def data_file(self, name):
+        name = self.normalize(name)
+        if name == self.DEFAULT_PROFILE and self.default_file:
+            return self.default_file
+        return os.path.join(self.directory, quote(name, safe="") + self.SUFFIX)
+
+    def list_profiles(self):
+        names = set(self._open)
+        if os.path.isdir(self.directory):
+            names.update(unquote(f[:-len(self.SUFFIX)]) for f in os.listdir(self.directory) if f.endswith(self.SUFFIX))
+        names.discard(self.DEFAULT_PROFILE)
+        return [self.DEFAULT_PROFILE] + sorted(names, key=str.lower)
+
+    def loaded(self):
+        with self.lock:
+            return list(self._open)
+
+    def get(self, name):
+        name = self.normalize(name)
+        with self.lock:
+            data_manager = self._open.get(name)
+            if data_manager is not None:
+                self._open.move_to_end(name)
+                return data_manager
+            path = self.data_file(name)
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            created = not os.path.exists(path)
+            data_manager = self.factory(path)
+            if created:
+                data_manager.save_data()
+            self._open[name] = data_manager
+            while len(self._open) > self.capacity:
+                _, evicted = self._open.popitem(last=False)
+                evicted.close()
+            return data_manager
+
+    def close(self):
+        error = None
+        with self.lock:
+            while self._open:
+                _, data_manager = self._open.popitem(last=False)
+                try:
+                    data_manager.close()
+                except OSError as e:
+                    error = error or e
+        if error is not None:
+            raise error
+
+
+class DataExporter:
+    HEADER = ["Type", "Date", "Time", "Name", "Duration", "Calories"]
+
+    @staticmethod
+    def _iter_pages(count, fetch, chunk_size):
+        for offset in range(0, count, chunk_size):
+            yield from fetch(offset, chunk_size)
+
+    @staticmethod
+    def iter_rows(data_manager, chunk_size=1000):
+        for item in DataExporter._iter_pages(data_manager.count_exercises(), data_manager.get_exercises_page, chunk_size):
+            yield ["Exercise", item.date, item.timestamp, item.name, item.duration, item.calories]
+        for item in DataExporter._iter_pages(data_manager.count_food_intake(), data_manager.get_food_intake_page, chunk_size):
+            yield ["Food", item.date, item.timestamp, item.name, "", item.calories]
+
+    @staticmethod
+    def open_output(filename, compress=None):
+        if compress is None:
+            compress = filename.endswith(".gz")
+        if compress:
+            return gzip.open(filename, 'wt', newline='')
+        return open(filename, 'w', newline='', buffering=1 << 16)
+
+    @staticmethod
+    def export_csv(data_manager, filename, compress=None, chunk_size=1000, progress=None, cancel=None):
+        total = data_manager.count_exercises() + data_manager.count_food_intake()
+        written = 0
+        with DataExporter.open_output(filename, compress) as f:
+            writer = csv.writer(f)
+            writer.writerow(DataExporter.HEADER)
+            batch = []
+            for row in DataExporter.iter_rows(data_manager, chunk_size):
+                batch.append(row)
+                if len(batch) == chunk_size:
+                    writer.writerows(batch)
+                    written += len(batch)
+                    batch = []
+                    if progress:
+                        progress(written, total)
+                    if cancel is not None and cancel.is_set():
+                        return written
+            writer.writerows(batch)
+            written += len(batch)
+        if progress:
+            progress(written, total)
+        return written
+
+
+class Instrumentation:
+    def __init__(self):
+        self.enabled = False
+        self.dump_file = None
+        self.targets = []
+        self.stats = {}
+        self._originals = {}
+        self._lock = threading.Lock()
+
+    def watch(self, cls, *names):
+        for name in names:
+            self.targets.append((cls, name))
+            if self.enabled:
+                self._wrap(cls, name)
+
+    def enable(self, dump_file=None):
+        self.dump_file = dump_file or self.dump_file
+        if not self.enabled:
+            self.enabled = True
+            for cls, name in self.targets:
+                self._wrap(cls, name)
+
+    def disable(self):
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals.clear()
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def _wrap(self, cls, name):
+        if (cls, name) in self._originals:
+            return
+        original = cls.__dict__[name]
+        key = f"{cls.__name__}.{name}"
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(key, time.perf_counter() - start)
+
+        self._originals[(cls, name)] = original
+        setattr(cls, name, timed)
+
+    def record(self, key, elapsed):
+        with self._lock:
+            stat = self.stats.get(key)
+            if stat is None:
+                stat = self.stats[key] = {"count": 0, "total_s": 0.0, "max_s": 0.0, "last_s": 0.0}
+            stat["count"] += 1
+            stat["total_s"] += elapsed
+            stat["max_s"] = max(stat["max_s"], elapsed)
+            stat["last_s"] = elapsed
+
+    @staticmethod
+    def data_files(data_manager):
+        storage = getattr(data_manager, "storage", None)
+        storage = getattr(storage, "storage", storage)
+        paths = [getattr(storage, "data_file", data_manager.data_file), getattr(storage, "journal_file", None)]
+        if isinstance(data_manager, SQLiteDataManager):
+            paths.append(data_manager.data_file + "-wal")
+        sizes = {path: os.path.getsize(path) for path in paths if path and os.path.exists(path)}
+        segment_dir = getattr(storage, "segment_dir", None)
+        if segment_dir and os.path.isdir(segment_dir):
+            with os.scandir(segment_dir) as entries:
+                sizes[segment_dir] = sum(entry.stat().st_size for entry in entries if entry.is_file())
+        return sizes
+
+    def snapshot(self, data_manager=None):
+        with self._lock:
+            timings = {key: dict(stat, mean_s=stat["total_s"] / stat["count"]) for key, stat in self.stats.items()}
+        result = {"enabled": self.enabled, "timings": timings}
+        if data_manager is not None:
+            result["records"] = {
+                "exercises": data_manager.count_exercises(),
+                "food_intake": data_manager.count_food_intake()
+            }
+            result["files"] = self.data_files(data_manager)
+        return result
+
+    def dump(self, filename, data_manager=None):
+        with open(filename, 'w') as f:
+            json.dump(self.snapshot(data_manager), f, indent=2)
+
+
+instrumentation = Instrumentation()
+instrumentation.watch(DataManager, "save_data", "load_data", "get_exercises", "get_food_intake", "_commit")
+instrumentation.watch(SQLiteDataManager, "save_data", "load_data", "get_exercises", "get_food_intake")
+
+
+class PagedRowCache:
+    def __init__(self, fetch, page_size=100, capacity=2000):
+        self.fetch = fetch
+        self.page_size = page_size
+        self.capacity = max(capacity, page_size)
+        self._rows = OrderedDict()
+
+    def clear(self):
+        self._rows.clear()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _load_page(self, index):
+        start = index - index % self.page_size
+        for offset, record in enumerate(self.fetch(start, self.page_size)):
+            self._rows[start + offset] = record.get_summary()
+            self._rows.move_to_end(start + offset)
+        while len(self._rows) > self.capacity:
+            self._rows.popitem(last=False)
+
+    def get(self, index):
+        row = self._rows.get(index)
+        if row is None:
+            self._load_page(index)
+            row = self._rows[index]
+        else:
+            self._rows.move_to_end(index)
+        return row
+
+    def newest_first(self, first, count, total):
+        return [self.get(total - 1 - row) for row in range(first, min(first + count, total))]
+
+
+def parse_measure(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return value if 0 < value < math.inf else math.nan
+
+
+def bmi_from_measures(height_cm, weight_kg):
+    height = height_cm / 100
+    return weight_kg / (height * height)
+
+
+class BMICalculatorService:
+    CATEGORY_BOUNDS = (18.5, 25, 30)
+    CATEGORIES = ("Underweight", "Normal weight", "Overweight", "Obese")
+
+    @staticmethod
+    def calculate_bmi(height_cm, weight_kg):
+        try:
+            height = float(height_cm) / 100
+            weight = float(weight_kg)
+            bmi = weight / (height * height)
+            return bmi
+        except Exception:
+            return None
+
+    @staticmethod
+    def get_bmi_category(bmi):
+        if bmi is None:
+            return "Invalid"
+        if bmi < 18.5:
+            return "Underweight"
+        elif 18.5 <= bmi < 25:
+            return "Normal weight"
+        elif 25 <= bmi < 30:
+            return "Overweight"
+        else:
+            return "Obese"
+
+    @staticmethod
+    def calculate_bmi_batch(heights_cm, weights_kg):
+        heights = array('d', map(parse_measure, heights_cm))
+        weights = array('d', map(parse_measure, weights_kg))
+        if len(heights) != len(weights):
+            raise ValueError("Height and weight columns must have the same length")
+        bmis = array('d', map(bmi_from_measures, heights, weights))
+        valid = bytes(map(math.isfinite, bmis))
+        return bmis, valid
+
+    @staticmethod
+    def get_bmi_category_batch(bmis, valid):
+        categories = BMICalculatorService.CATEGORIES
+        bounds = BMICalculatorService.CATEGORY_BOUNDS
+        return [categories[bisect_right(bounds, bmi)] if ok else "Invalid" for bmi, ok in zip(bmis, valid)]
+
+    @staticmethod
+    def process_csv(source, target, height_column="height_cm", weight_column="weight_kg", chunk_size=65536):
+        reader = csv.reader(source)
+        writer = csv.writer(target)
+        header = next(reader, None)
+        if header is None:
+            return 0, 0
+        try:
+            height_index = header.index(height_column)
+            weight_index = header.index(weight_column)
+        except ValueError:
+            raise ValueError(f"CSV header must contain {height_column!r} and {weight_column!r}") from None
+        writer.writerow(header + ["bmi", "category"])
+        columns = len(header)
+        total = invalid = 0
+        while True:
+            rows = [row if len(row) >= columns else row + [""] * (columns - len(row)) for row in islice(reader, chunk_size)]
+            if not rows:
+                return total, invalid
+            heights = [row[height_index] for row in rows]
+            weights = [row[weight_index] for row in rows]
+            bmis, valid = BMICalculatorService.calculate_bmi_batch(heights, weights)
+            categories = BMICalculatorService.get_bmi_category_batch(bmis, valid)
+            writer.writerows(
+                row + [f"{bmi:.2f}" if ok else "", category]
+                for row, bmi, ok, category in zip(rows, bmis, valid, categories)
+            )
+            total += len(rows)
+            invalid += len(rows) - sum(valid)
+
+
+class CalorieNeedsService:
+    ACTIVITY_MULTIPLIERS = {
+        "Sedentary": 1.2,
+        "Lightly Active": 1.375,
+        "Moderately Active": 1.55,
+        "Very Active": 1.725,
+        "Extra Active": 1.9
+    }
+    DEFAULT_MULTIPLIER = 1.2
+
+    @staticmethod
+    def calculate_bmr(age, gender, weight_kg, height_cm):
+        if gender == "Male":
+            return 88.362 + (13.397 * weight_kg) + (4.799 * height_cm) - (5.677 * age)
+        return 447.593 + (9.247 * weight_kg) + (3.098 * height_cm) - (4.330 * age)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def calculate_daily_calories(age, gender, weight_kg, height_cm, activity_level):
+        age = int(age)
+        weight = parse_measure(weight_kg)
+        height = parse_measure(height_cm)
+        if age <= 0 or math.isnan(weight) or math.isnan(height):
+            raise ValueError("Age, weight and height must be positive numbers")
+        multiplier = CalorieNeedsService.ACTIVITY_MULTIPLIERS.get(activity_level, CalorieNeedsService.DEFAULT_MULTIPLIER)
+        calories = CalorieNeedsService.calculate_bmr(age, gender, weight, height) * multiplier
+        # Very old, light or short profiles push Harris-Benedict to zero or below; round() must still give a usable target.
+        if calories < 1:
+            raise ValueError("Age, weight and height do not give a positive calorie target")
+        return calories
+
+    @staticmethod
+    def _daily_calories_or_nan(profile):
+        try:
+            return CalorieNeedsService.calculate_daily_calories(*profile)
+        except (TypeError, ValueError, OverflowError):
+            return math.nan
+
+    @staticmethod
+    def calculate_daily_calories_batch(ages, genders, weights_kg, heights_cm, activity_levels):
+        columns = (ages, genders, weights_kg, heights_cm, activity_levels)
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("Profile columns must have the same length")
+        profiles = list(zip(*columns))
+        unique = dict.fromkeys(profiles)
+        for profile in unique:
+            unique[profile] = CalorieNeedsService._daily_calories_or_nan(profile)
+        calories = array('d', map(unique.__getitem__, profiles))
+        valid = bytes(map(math.isfinite, calories))
+        return calories, valid
+
+
+class METCatalog:
+    DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "met_catalog.csv")
+
+    def __init__(self, path=None):
+        self.path = path or self.DEFAULT_FILE
+        self._values = None
+        self._words = None
+        self._find = functools.lru_cache(maxsize=4096)(self._match)
+
+    @staticmethod
+    def normalize(name):
+        return " ".join("".join(c if c.isalnum() else " " for c in name).split()).casefold()
+
+    def values(self):
+        if self._values is None:
+            with open(self.path, 'r', newline='') as f:
+                values = {self.normalize(row["activity"]): float(row["met"]) for row in csv.DictReader(f)}
+            self._words = sorted(((frozenset(key.split()), met) for key, met in values.items()),
+                                 key=lambda item: -len(item[0]))
+            self._values = values
+        return self._values
+
+    def _match(self, key):
+        values = self.values()
+        if key in values:
+            return values[key]
+        words = set(key.split())
+        for key_words, met in self._words:
+            if key_words <= words:
+                return met
+        return None
+
+    def met(self, name):
+        if not isinstance(name, str):
+            return None
+        return self._find(self.normalize(name))
+
+
+class CalorieEstimator:
+    DEFAULT_WEIGHT_KG = 70
+    catalog = METCatalog()
+
+    @classmethod
+    def estimate(cls, name, duration_min, weight_kg=None):
+        met = cls.catalog.met(name)
+        duration = parse_measure(duration_min)
+        weight = parse_measure(weight_kg or cls.DEFAULT_WEIGHT_KG)
+        if met is None or math.isnan(duration) or math.isnan(weight):
+            return None
+        return met * weight * duration / 60
+
+    @classmethod
+    def estimate_batch(cls, names, durations_min, weight_kg=None):
+        weight = parse_measure(weight_kg or cls.DEFAULT_WEIGHT_KG)
+        mets = array('d', (math.nan if met is None else met for met in map(cls.catalog.met, names)))
+        durations = array('d', map(parse_measure, durations_min))
+        if len(mets) != len(durations):
+            raise ValueError("Name and duration columns must have the same length")
+        calories = array('d', (met * weight * duration / 60 for met, duration in zip(mets, durations)))
+        valid = bytes(map(math.isfinite, calories))
+        return calories, valid
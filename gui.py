@@ -0,0 +1,735 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog, font as tkfont
+from datetime import datetime, timedelta
+import queue
+import threading
+from abc import ABC, abstractmethod
+
+from core import (BMICalculatorService, CalorieEstimator, CalorieNeedsService, DataExporter, PagedRowCache, ProfileManager, RecordValidator,
+                  instrumentation)
+from server import ServerThread
+
+
+class VirtualHistoryList(ttk.Frame):
+    def __init__(self, parent, count, fetch, width=50, height=25, page_size=100, cache_size=2000):
+        super().__init__(parent)
+        self.count = count
+        self.rows = PagedRowCache(fetch, page_size, cache_size)
+        self.visible = height
+        self.top = 0
+        self.total = 0
+        self.placeholder = None
+        self.listbox = tk.Listbox(self, width=width, height=height)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.listbox.bind("<Configure>", self._on_configure)
+        self.listbox.bind("<MouseWheel>", lambda e: self._scroll_by(-1 if e.delta > 0 else 1))
+        self.listbox.bind("<Button-4>", lambda e: self._scroll_by(-1))
+        self.listbox.bind("<Button-5>", lambda e: self._scroll_by(1))
+
+    def reset(self):
+        self.rows.clear()
+        self.top = 0
+        self.placeholder = None
+        self.refresh()
+
+    def show_placeholder(self, text):
+        self.placeholder = text
+        self._render()
+
+    def refresh(self):
+        self.total = self.count()
+        self._render()
+
+    def _scroll_by(self, rows):
+        self.top += rows
+        self._render()
+        return "break"
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.top = int(float(amount) * self.total)
+            self._render()
+        else:
+            self._scroll_by(int(amount) * (self.visible if unit == "pages" else 1))
+
+    def _on_configure(self, event):
+        linespace = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace")
+        visible = max(1, event.height // max(1, linespace))
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    def _render(self):
+        self.listbox.delete(0, tk.END)
+        if self.placeholder is not None:
+            self.listbox.insert(tk.END, self.placeholder)
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.top = max(0, min(self.top, self.total - self.visible))
+        rows = self.rows.newest_first(self.top, self.visible, self.total)
+        if rows:
+            self.listbox.insert(tk.END, *rows)
+        if self.total:
+            self.scrollbar.set(self.top / self.total, min(1.0, (self.top + self.visible) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+class BaseFrame(ttk.Frame, ABC):
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        self.create_widgets()
+
+    @abstractmethod
+    def create_widgets(self):
+        pass
+
+    def export_data(self):
+        pass  
+
+    def on_show(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ExerciseTracker(BaseFrame):
+    def __init__(self, parent, controller):
+        self.profiles = ProfileManager()
+        self.profile = ProfileManager.DEFAULT_PROFILE
+        self.data_manager = None
+        self._rendered = {}
+        self._export_thread = None
+        self._load_thread = None
+        self._load_results = queue.Queue()
+        super().__init__(parent, controller)
+        self.bind("<Map>", self._on_map)
+        self._schedule_rollover()
+
+    def _schedule_rollover(self):
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self.after(int((midnight - now).total_seconds() * 1000) + 1000, self._on_rollover)
+
+    def _on_rollover(self):
+        if self.data_manager is not None and self.data_manager.roll_over():
+            self.update_calories()
+        self._schedule_rollover()
+
+    def _on_map(self, event):
+        self.unbind("<Map>")
+        self.after_idle(self._start_loading)
+
+    def _start_loading(self):
+        profile = self.profile
+
+        def run():
+            try:
+                data_manager = self.profiles.get(profile)
+                self._load_results.put(("done", data_manager))
+            except Exception as e:
+                self._load_results.put(("error", e))
+
+        self._load_thread = threading.Thread(target=run, daemon=True)
+        self._load_thread.start()
+        self.after(50, self._poll_loading)
+
+    def _poll_loading(self):
+        try:
+            kind, value = self._load_results.get_nowait()
+        except queue.Empty:
+            self.after(50, self._poll_loading)
+            return
+        self._load_thread = None
+        if kind == "error":
+            self.history_list.show_placeholder("Could not load history")
+            self.food_history_list.show_placeholder("Could not load history")
+            messagebox.showerror("Error", f"Error loading data: {value}")
+            return
+        self._show_data_manager(value)
+
+    def _show_data_manager(self, data_manager):
+        self.data_manager = data_manager
+        self.controller.data_manager_changed(data_manager)
+        data_manager.roll_over()
+        self.loading_label.config(text="")
+        self.profile_box.config(values=self.profiles.list_profiles())
+        self.update_calories()
+        self.update_history()
+
+    def switch_profile(self, event=None):
+        if self._load_thread is not None or self._export_thread is not None:
+            messagebox.showinfo("Please wait", "Finish the current load or export before switching profiles")
+            self.profile_box.set(self.profile)
+            return
+        try:
+            name = ProfileManager.normalize(self.profile_box.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            self.profile_box.set(self.profile)
+            return
+        self.profile_box.set(name)
+        if name == self.profile:
+            return
+        self.profile = name
+        self._rendered = {}
+        if name in self.profiles.loaded():
+            self._show_data_manager(self.profiles.get(name))
+            return
+        self.data_manager = None
+        self.loading_label.config(text="Loading history...")
+        self.history_list.show_placeholder("Loading...")
+        self.food_history_list.show_placeholder("Loading...")
+        self._start_loading()
+
+    def is_loading(self):
+        if self.data_manager is None:
+            messagebox.showinfo("Please wait", "History is still loading")
+            return True
+        return False
+
+    def create_widgets(self):
+        self.profile_frame = ttk.Frame(self, padding="10 10 10 0")
+        self.profile_frame.grid(row=0, column=0, columnspan=3, sticky=tk.W)
+        ttk.Label(self.profile_frame, text="Profile:").pack(side=tk.LEFT)
+        self.profile_box = ttk.Combobox(self.profile_frame, values=[self.profile], width=30)
+        self.profile_box.set(self.profile)
+        self.profile_box.pack(side=tk.LEFT, padx=5)
+        self.profile_box.bind("<<ComboboxSelected>>", self.switch_profile)
+        self.profile_box.bind("<Return>", self.switch_profile)
+        ttk.Button(self.profile_frame, text="Switch", command=self.switch_profile).pack(side=tk.LEFT)
+        self.main_frame = ttk.Frame(self, padding="10")
+        self.main_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.history_frame = ttk.Frame(self, padding="10")
+        self.history_frame.grid(row=1, column=1, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.food_history_frame = ttk.Frame(self, padding="10")
+        self.food_history_frame.grid(row=1, column=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+       
+        ttk.Label(self.history_frame, text="Exercise History", font=('Arial', 14, 'bold')).pack(pady=10)
+        self.history_list = VirtualHistoryList(
+            self.history_frame,
+            lambda: self.data_manager.count_exercises(),
+            lambda offset, limit: self.data_manager.get_exercises_page(offset, limit)
+        )
+        self.history_list.pack(fill=tk.BOTH, expand=True)
+        ttk.Button(self.history_frame, text="Clear Exercise History", command=self.clear_history).pack(pady=10)
+        ttk.Label(self.food_history_frame, text="Food History", font=('Arial', 14, 'bold')).pack(pady=10)
+        self.food_history_list = VirtualHistoryList(
+            self.food_history_frame,
+            lambda: self.data_manager.count_food_intake(),
+            lambda offset, limit: self.data_manager.get_food_intake_page(offset, limit)
+        )
+        self.food_history_list.pack(fill=tk.BOTH, expand=True)
+        ttk.Button(self.food_history_frame, text="Clear Food History", command=self.clear_food_history).pack(pady=10)
+        ttk.Label(self.main_frame, text="Add Exercise", font=('Arial', 14, 'bold')).grid(row=0, column=0, columnspan=2, pady=10)
+        ttk.Label(self.main_frame, text="Exercise Name:").grid(row=1, column=0, sticky=tk.W)
+        self.exercise_name = ttk.Combobox(self.main_frame)
+        self.exercise_name.grid(row=1, column=1, padx=5, pady=5)
+        self._bind_suggestions(self.exercise_name, "exercises")
+        ttk.Label(self.main_frame, text="Duration (minutes):").grid(row=2, column=0, sticky=tk.W)
+        self.duration = ttk.Entry(self.main_frame)
+        self.duration.grid(row=2, column=1, padx=5, pady=5)
+        ttk.Label(self.main_frame, text="Calories Burned (blank = estimate):").grid(row=3, column=0, sticky=tk.W)
+        self.calorie_burned = ttk.Entry(self.main_frame)
+        self.calorie_burned.grid(row=3, column=1, padx=5, pady=5)
+        ttk.Button(self.main_frame, text="Add Exercise", command=self.add_exercise).grid(row=4, column=0, columnspan=2, pady=10)
+        ttk.Label(self.main_frame, text="Food Name:").grid(row=5, column=0, sticky=tk.W)
+        self.food_name = ttk.Combobox(self.main_frame)
+        self.food_name.grid(row=5, column=1, padx=5, pady=5)
+        self._bind_suggestions(self.food_name, "food_intake")
+        ttk.Label(self.main_frame, text="Calories:").grid(row=6, column=0, sticky=tk.W)
+        self.calorie_intake = ttk.Entry(self.main_frame)
+        self.calorie_intake.grid(row=6, column=1, padx=5, pady=5)
+        ttk.Button(self.main_frame, text="Add Food", command=self.add_calorie).grid(row=7, column=0, columnspan=2, pady=10)
+        ttk.Label(self.main_frame, text="Today's Calories", font=('Arial', 14, 'bold')).grid(row=8, column=0, columnspan=2, pady=10)
+        self.total_calories_label = ttk.Label(self.main_frame, text="Calories Burned Today: 0")
+        self.total_calories_label.grid(row=9, column=0, columnspan=2, pady=5)
+        self.total_intake_label = ttk.Label(self.main_frame, text="Calories Intake Today: 0")
+        self.total_intake_label.grid(row=10, column=0, columnspan=2, pady=5)
+        self.net_calories_label = ttk.Label(self.main_frame, text="Net Calories Today: 0")
+        self.net_calories_label.grid(row=11, column=0, columnspan=2, pady=5)
+        self.target_progress = ttk.Progressbar(self.main_frame, orient='horizontal', length=200, mode='determinate')
+        self.target_progress.grid(row=12, column=0, columnspan=2, pady=5)
+        self.target_label = ttk.Label(self.main_frame, text="Target Progress: 0%")
+        self.target_label.grid(row=13, column=0, columnspan=2, pady=5)
+        ttk.Button(self.main_frame, text="Reset Total Calories", command=self.reset_calories).grid(row=14, column=0, columnspan=2, pady=10)
+        self.date_label = ttk.Label(self.main_frame, text=f"Date: {datetime.now().strftime('%d/%m/%Y')}")
+        self.date_label.grid(row=15, column=0, columnspan=2, pady=5)
+        self.export_status = ttk.Label(self.main_frame, text="")
+        self.export_status.grid(row=16, column=0, columnspan=2, pady=5)
+        self.loading_label = ttk.Label(self.main_frame, text="Loading history...")
+        self.loading_label.grid(row=17, column=0, columnspan=2, pady=5)
+        self.history_list.show_placeholder("Loading...")
+        self.food_history_list.show_placeholder("Loading...")
+
+    def _bind_suggestions(self, combobox, key):
+        combobox.bind("<KeyRelease>", lambda e: self._suggest(combobox, key, e))
+        combobox.bind("<<ComboboxSelected>>", lambda e: self._prefill(combobox, key))
+
+    def _suggest(self, combobox, key, event):
+        if self.data_manager is None or event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        prefix = combobox.get()
+        combobox.config(values=self.data_manager.get_name_suggestions(key, prefix) if prefix.strip() else [])
+
+    def _prefill(self, combobox, key):
+        if self.data_manager is None:
+            return
+        last = self.data_manager.get_last_entry(key, combobox.get())
+        if last is None:
+            return
+        if key == "exercises":
+            fields = [(self.duration, last["duration"]), (self.calorie_burned, last["calories"])]
+        else:
+            fields = [(self.calorie_intake, last["calories"])]
+        for entry, value in fields:
+            entry.delete(0, tk.END)
+            if value is not None:
+                entry.insert(0, value)
+
+    def add_exercise(self):
+        if self.is_loading():
+            return
+        try:
+            calories = self.calorie_burned.get()
+            if not calories.strip():
+                estimate = CalorieEstimator.estimate(self.exercise_name.get(), self.duration.get(), self.data_manager.get_weight())
+                if estimate is not None:
+                    calories = f"{estimate:.1f}"
+            try:
+                exercise = RecordValidator.parse_exercise(
+                    self.exercise_name.get(), self.duration.get(), calories,
+                    self.data_manager.get_current_date(), datetime.now().strftime("%H:%M")
+                )
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            self.data_manager.add_exercise(exercise)
+            self.update_calories()
+            self.update_history()
+            self.exercise_name.delete(0, tk.END)
+            self.duration.delete(0, tk.END)
+            self.calorie_burned.delete(0, tk.END)
+            messagebox.showinfo("Success", f"Exercise '{exercise.name}' added successfully!")
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+
+    def add_calorie(self):
+        if self.is_loading():
+            return
+        try:
+            try:
+                food = RecordValidator.parse_food(
+                    self.food_name.get(), self.calorie_intake.get(),
+                    self.data_manager.get_current_date(), datetime.now().strftime("%H:%M")
+                )
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            self.data_manager.add_food(food)
+            self.update_calories()
+            self.update_history()
+            self.food_name.delete(0, tk.END)
+            self.calorie_intake.delete(0, tk.END)
+            messagebox.showinfo("Success", f"Food '{food.name}' added successfully!")
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+
+    def update_calories(self):
+        total_burned = self.data_manager.get_today_calories_burned()
+        total_intake = self.data_manager.get_today_calories_intake()
+        self.date_label.config(text=f"Date: {self.data_manager.get_current_date()}")
+        self.total_calories_label.config(text=f"Calories Burned Today: {total_burned:.1f}")
+        self.total_intake_label.config(text=f"Calories Intake Today: {total_intake:.1f}")
+        net_calories = total_intake - total_burned
+        self.net_calories_label.config(text=f"Net Calories Today: {net_calories:.1f}")
+        progress = min(100, (total_burned / self.data_manager.get_target_calories()) * 100)
+        self.target_progress['value'] = progress
+        self.target_label.config(text=f"Target Progress: {progress:.1f}%")
+        if progress >= 100:
+            self.target_progress.configure(style='Green.Horizontal.TProgressbar')
+        elif progress >= 75:
+            self.target_progress.configure(style='Yellow.Horizontal.TProgressbar')
+        else:
+            self.target_progress.configure(style='Red.Horizontal.TProgressbar')
+
+    def update_history(self):
+        self._sync_history(self.history_list, "exercises")
+        self._sync_history(self.food_history_list, "food_intake")
+
+    def _sync_history(self, history_list, key):
+        generation = self.data_manager.generations[key]
+        if self._rendered.get(key) != generation:
+            self._rendered[key] = generation
+            history_list.reset()
+        else:
+            history_list.refresh()
+
+    def clear_history(self):
+        if self.is_loading():
+            return
+        self.data_manager.clear_exercises()
+        self.update_calories()
+        self.update_history()
+        messagebox.showinfo("Success", "Exercise history cleared successfully!")
+
+    def clear_food_history(self):
+        if self.is_loading():
+            return
+        self.data_manager.clear_food()
+        self.update_calories()
+        self.update_history()
+        messagebox.showinfo("Success", "Food history cleared successfully!")
+
+    def reset_calories(self):
+        if self.is_loading():
+            return
+        self.data_manager.reset_all()
+        self.update_calories()
+        self.update_history()
+        messagebox.showinfo("Success", "All data has been reset successfully!")
+
+    def export_data(self):
+        if self.is_loading():
+            return
+        if self._export_thread is not None:
+            messagebox.showinfo("Export", "An export is already running")
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            initialfile=f"exercise_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            filetypes=[("CSV files", "*.csv"), ("Compressed CSV files", "*.csv.gz")]
+        )
+        if not filename:
+            return
+        updates = queue.Queue()
+
+        def run():
+            try:
+                count = DataExporter.export_csv(
+                    self.data_manager, filename,
+                    progress=lambda done, total: updates.put(("progress", done, total))
+                )
+                updates.put(("done", count, filename))
+            except Exception as e:
+                updates.put(("error", str(e), filename))
+
+        self._export_thread = threading.Thread(target=run, daemon=True)
+        self._export_thread.start()
+        self.after(100, self._poll_export, updates)
+
+    def _poll_export(self, updates):
+        while True:
+            try:
+                kind, first, second = updates.get_nowait()
+            except queue.Empty:
+                self.after(100, self._poll_export, updates)
+                return
+            if kind == "progress":
+                percent = first / second * 100 if second else 100
+                self.export_status.config(text=f"Exporting... {percent:.0f}%")
+                continue
+            self._export_thread = None
+            self.export_status.config(text="")
+            if kind == "done":
+                messagebox.showinfo("Success", f"{first} records exported to {second}")
+            else:
+                messagebox.showerror("Error", f"Error exporting data: {first}")
+            return
+
+    def close(self):
+        if self._load_thread is not None:
+            self._load_thread.join()
+        self.profiles.close()
+
+
+instrumentation.watch(ExerciseTracker, "update_history", "update_calories")
+
+
+class DiagnosticsFrame(BaseFrame):
+    def create_widgets(self):
+        ttk.Label(self, text="Diagnostics", font=('Arial', 16, 'bold')).pack(pady=10, padx=10)
+        columns = ("count", "total", "mean", "max")
+        self.tree = ttk.Treeview(self, columns=columns, height=12)
+        self.tree.heading("#0", text="Call")
+        self.tree.column("#0", width=260)
+        for column, title in zip(columns, ("Calls", "Total (ms)", "Mean (ms)", "Max (ms)")):
+            self.tree.heading(column, text=title)
+            self.tree.column(column, width=100, anchor=tk.E)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.summary = ttk.Label(self, text="", justify=tk.LEFT)
+        self.summary.pack(pady=10)
+        buttons = ttk.Frame(self)
+        buttons.pack(pady=5)
+        ttk.Button(buttons, text="Refresh", command=self.refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Reset", command=self.reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Save JSON...", command=self.save).pack(side=tk.LEFT, padx=5)
+
+    def data_manager(self):
+        tracker = self.controller.frames.get("ExerciseTracker")
+        return tracker.data_manager if tracker is not None else None
+
+    def on_show(self):
+        self.refresh()
+
+    def refresh(self):
+        snapshot = instrumentation.snapshot(self.data_manager())
+        self.tree.delete(*self.tree.get_children())
+        for key, stat in sorted(snapshot["timings"].items()):
+            self.tree.insert("", tk.END, text=key, values=(
+                stat["count"], f"{stat['total_s'] * 1000:.1f}", f"{stat['mean_s'] * 1000:.2f}", f"{stat['max_s'] * 1000:.1f}"
+            ))
+        lines = []
+        if "records" in snapshot:
+            records = snapshot["records"]
+            lines.append(f"Exercises: {records['exercises']}    Food entries: {records['food_intake']}")
+            lines.extend(f"{path}: {size / 1024:.1f} KB" for path, size in snapshot["files"].items())
+        else:
+            lines.append("History is not loaded")
+        self.summary.config(text="\n".join(lines))
+
+    def reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+    def save(self):
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile=f"diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            filetypes=[("JSON files", "*.json")]
+        )
+        if not filename:
+            return
+        try:
+            instrumentation.dump(filename, self.data_manager())
+        except OSError as e:
+            messagebox.showerror("Error", f"Error saving diagnostics: {e}")
+
+
+class BMICalculator(BaseFrame):
+    def create_widgets(self):
+        label = ttk.Label(self, text="BMI Calculator", font=('Arial', 16, 'bold'))
+        label.pack(pady=10, padx=10)
+        ttk.Label(self, text="Height (cm):").pack()
+        self.height = ttk.Entry(self)
+        self.height.pack()
+        ttk.Label(self, text="Weight (kg):").pack()
+        self.weight = ttk.Entry(self)
+        self.weight.pack()
+        self.result = ttk.Label(self, text="")
+        self.result.pack(pady=10)
+        ttk.Button(self, text="Calculate BMI", command=self.calculate_bmi).pack()
+
+    def calculate_bmi(self):
+        height_val = self.height.get()
+        weight_val = self.weight.get()
+        bmi = BMICalculatorService.calculate_bmi(height_val, weight_val)
+        if bmi is None:
+            self.result.config(text="Please enter valid numbers")
+            return
+        category = BMICalculatorService.get_bmi_category(bmi)
+        self.result.config(text=f"BMI: {bmi:.1f} - {category}")
+        self.controller.remember_weight(weight_val)
+
+
+class CalorieCalculator(BaseFrame):
+    def create_widgets(self):
+        label = ttk.Label(self, text="Daily Calorie Needs Calculator", font=('Arial', 16, 'bold'))
+        label.pack(pady=10, padx=10)
+        ttk.Label(self, text="Age:").pack()
+        self.age = ttk.Entry(self)
+        self.age.pack()
+        ttk.Label(self, text="Gender:").pack()
+        self.gender = ttk.Combobox(self, values=["Male", "Female"])
+        self.gender.pack()
+        ttk.Label(self, text="Weight (kg):").pack()
+        self.weight = ttk.Entry(self)
+        self.weight.pack()
+        ttk.Label(self, text="Height (cm):").pack()
+        self.height = ttk.Entry(self)
+        self.height.pack()
+        ttk.Label(self, text="Activity Level:").pack()
+        self.activity = ttk.Combobox(self, values=list(CalorieNeedsService.ACTIVITY_MULTIPLIERS))
+        self.activity.pack()
+        self.result = ttk.Label(self, text="")
+        self.result.pack(pady=10)
+        ttk.Button(self, text="Calculate Daily Calories", command=self.calculate_calories).pack()
+        ttk.Button(self, text="Use as Daily Target", command=self.use_as_target).pack(pady=5)
+
+    def profile(self):
+        return self.age.get(), self.gender.get(), self.weight.get(), self.height.get(), self.activity.get()
+
+    def calculate_calories(self):
+        try:
+            daily_calories = CalorieNeedsService.calculate_daily_calories(*self.profile())
+            self.result.config(text=f"Daily Calorie Needs: {daily_calories:.0f} calories")
+            self.controller.remember_weight(self.weight.get())
+        except ValueError:
+            self.result.config(text="Please enter valid numbers")
+
+    def use_as_target(self):
+        tracker = self.controller.get_frame("ExerciseTracker")
+        if tracker.is_loading():
+            return
+        try:
+            target = tracker.data_manager.derive_target_calories(*self.profile())
+        except ValueError:
+            self.result.config(text="Please enter valid numbers")
+            return
+        tracker.update_calories()
+        self.result.config(text=f"Daily target set to {target} calories")
+
+
+class MainApplication(tk.Tk):
+    def __init__(self, *args, serve_port=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.title("Health & Fitness Tracker")
+        self.geometry("1000x800")
+        self.configure(bg='#f0f0f0')
+        container = ttk.Frame(self)
+        container.pack(side="top", fill="both", expand=True)
+        container.grid_rowconfigure(0, weight=1)
+        container.grid_columnconfigure(0, weight=1)
+        menubar = tk.Menu(container, font=('Arial', 12))
+        file_menu = tk.Menu(menubar, tearoff=0, font=('Arial', 12))
+        file_menu.add_command(label="Export...", command=self.export_data, font=('Arial', 12))
+        self.server = None
+        self.server_port = 8765 if serve_port is None else serve_port
+        self.serve_var = tk.BooleanVar(value=serve_port is not None)
+        self._served_versions = None
+        file_menu.add_checkbutton(label="Serve Local API", variable=self.serve_var, command=self.toggle_server,
+                                  font=('Arial', 12))
+        menubar.add_cascade(label="File", menu=file_menu, font=('Arial', 12))
+        nav_menu = tk.Menu(menubar, tearoff=0, font=('Arial', 12))
+        nav_menu.add_command(label="Exercise Tracker", command=lambda: self.show_frame("ExerciseTracker"), font=('Arial', 12))
+        nav_menu.add_command(label="BMI Calculator", command=lambda: self.show_frame("BMICalculator"), font=('Arial', 12))
+        nav_menu.add_command(label="Calorie Calculator", command=lambda: self.show_frame("CalorieCalculator"), font=('Arial', 12))
+        menubar.add_cascade(label="Navigation", menu=nav_menu, font=('Arial', 12))
+        self.nav_menu = nav_menu
+        self.bind_all("<Control-Shift-D>", lambda e: self.show_diagnostics())
+        self.config(menu=menubar)
+        style = ttk.Style()
+        style.configure('TMenubutton', font=('Arial', 12))
+        style.configure('TButton', font=('Arial', 11))
+        style.configure('TLabel', font=('Arial', 11))
+        self.container = container
+        self.frames = {}
+        self.frame_factories = {}
+        for F in (ExerciseTracker, BMICalculator, CalorieCalculator, DiagnosticsFrame):
+            self.register_frame(F.__name__, F)
+        if instrumentation.enabled:
+            self.add_diagnostics_menu()
+        self.show_frame("ExerciseTracker")
+        if serve_port is not None:
+            self.start_server()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def register_frame(self, name, factory):
+        self.frame_factories[name] = factory
+
+    def get_frame(self, cont):
+        frame = self.frames.get(cont)
+        if frame is None:
+            frame = self.frame_factories[cont](self.container, self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[cont] = frame
+        return frame
+
+    def show_frame(self, cont):
+        frame = self.get_frame(cont)
+        frame.tkraise()
+        frame.on_show()
+        return frame
+
+    def remember_weight(self, weight_kg):
+        tracker = self.frames.get("ExerciseTracker")
+        if tracker is None or tracker.data_manager is None:
+            return
+        try:
+            tracker.data_manager.set_weight(weight_kg)
+        except ValueError:
+            pass
+
+    def add_diagnostics_menu(self):
+        self.nav_menu.add_separator()
+        self.nav_menu.add_command(label="Diagnostics", command=lambda: self.show_frame("DiagnosticsFrame"), font=('Arial', 12))
+
+    def show_diagnostics(self):
+        if not instrumentation.enabled:
+            instrumentation.enable()
+            self.add_diagnostics_menu()
+        self.show_frame("DiagnosticsFrame")
+
+    def export_data(self):
+        self.show_frame("ExerciseTracker").export_data()
+
+    def toggle_server(self):
+        if self.serve_var.get():
+            self.start_server()
+            return
+        try:
+            self.stop_server()
+        except OSError as e:
+            messagebox.showerror("Error", str(e))
+
+    def start_server(self):
+        if not self.serve_var.get() or self.server is not None:
+            return
+        tracker = self.get_frame("ExerciseTracker")
+        if tracker.data_manager is None:
+            self.after(200, self.start_server)
+            return
+        try:
+            self.server = ServerThread(tracker.data_manager, port=self.server_port).start()
+        except OSError as e:
+            self.serve_var.set(False)
+            messagebox.showerror("Error", f"Could not start the local API: {e}")
+            return
+        self._served_versions = None
+        self.after(1000, self._poll_server)
+
+    def stop_server(self):
+        server, self.server = self.server, None
+        if server is not None:
+            server.stop()
+
+    def data_manager_changed(self, data_manager):
+        if self.server is not None:
+            self.server.set_data_manager(data_manager)
+            self._served_versions = None
+
+    def _poll_server(self):
+        # Records posted to the API only show up in the tracker once it redraws.
+        if self.server is None:
+            return
+        tracker = self.frames["ExerciseTracker"]
+        data_manager = tracker.data_manager
+        if data_manager is not None:
+            versions = tuple(data_manager.versions.values()), data_manager.get_current_date()
+            if self._served_versions is not None and versions != self._served_versions:
+                tracker.update_calories()
+                tracker.update_history()
+            self._served_versions = versions
+        self.after(1000, self._poll_server)
+
+    def on_close(self):
+        if instrumentation.dump_file:
+            tracker = self.frames.get("ExerciseTracker")
+            try:
+                instrumentation.dump(instrumentation.dump_file, tracker.data_manager if tracker else None)
+            except Exception as e:
+                print(f"Error writing diagnostics: {str(e)}")
+        try:
+            self.stop_server()
+        except OSError as e:
+            messagebox.showerror("Error", str(e))
+        for frame in self.frames.values():
+            try:
+                frame.close()
+            except OSError as e:
+                messagebox.showerror("Error", str(e))
+        self.destroy()
@@ -0,0 +1,138 @@
+import argparse
+import csv
+import gzip
+import json
+import sys
+from itertools import islice
+
+from core import CalorieEstimator, RecordValidator, open_data_manager
+
+
+def open_input(filename):
+    if filename.endswith(".gz"):
+        return gzip.open(filename, 'rt', newline='')
+    return open(filename, 'r', newline='')
+
+
+def record_type_of(fields):
+    record_type = fields.get("type") or ("Exercise" if fields.get("duration") not in (None, "") else "Food")
+    return str(record_type).strip().capitalize()
+
+
+def parse_record(fields):
+    record_type = record_type_of(fields)
+    date = fields.get("date", "")
+    timestamp = fields.get("timestamp", "")
+    if record_type == "Exercise":
+        return RecordValidator.parse_exercise(fields.get("name"), fields.get("duration"), fields.get("calories"), date, timestamp)
+    if record_type == "Food":
+        return RecordValidator.parse_food(fields.get("name"), fields.get("calories"), date, timestamp)
+    raise ValueError(f"Unknown record type: {fields.get('type')!r}")
+
+
+def csv_fields(row):
+    return {
+        "type": row.get("Type"),
+        "date": row.get("Date") or "",
+        "timestamp": row.get("Time") or "",
+        "name": row.get("Name"),
+        "duration": row.get("Duration"),
+        "calories": row.get("Calories")
+    }
+
+
+def jsonl_fields(line):
+    fields = json.loads(line)
+    if not isinstance(fields, dict):
+        raise ValueError("Expected a JSON object")
+    return fields
+
+
+def iter_rows(f, file_format):
+    if file_format == "csv":
+        return ((row, csv_fields) for row in csv.DictReader(f))
+    return ((line, jsonl_fields) for line in f if line.strip())
+
+
+def estimate_calories(batch, mode, weight_kg=None):
+    targets = [fields for fields in batch if record_type_of(fields) == "Exercise"
+               and (mode == "all" or fields.get("calories") in (None, ""))]
+    if not targets:
+        return
+    calories, valid = CalorieEstimator.estimate_batch([fields.get("name") for fields in targets],
+                                                      [fields.get("duration") for fields in targets], weight_kg)
+    for fields, value, ok in zip(targets, calories, valid):
+        if ok:
+            fields["calories"] = round(value, 1)
+
+
+def iter_records(f, file_format, skip_invalid=False, errors=None, estimate=None, weight_kg=None, chunk_size=4096):
+    def reject(number, e):
+        if not skip_invalid:
+            raise ValueError(f"Row {number}: {e}") from None
+        if errors is not None:
+            errors.append((number, str(e)))
+
+    rows = enumerate(iter_rows(f, file_format), 1)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        batch = []
+        for number, (row, to_fields) in chunk:
+            try:
+                batch.append((number, to_fields(row)))
+            except ValueError as e:
+                reject(number, e)
+        if estimate:
+            estimate_calories([fields for _, fields in batch], estimate, weight_kg)
+        for number, fields in batch:
+            try:
+                record = parse_record(fields)
+            except ValueError as e:
+                reject(number, e)
+                continue
+            yield record
+
+
+def detect_format(filename):
+    name = filename[:-3] if filename.endswith(".gz") else filename
+    return "jsonl" if name.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import exercise and food history into the tracker.")
+    parser.add_argument("source", help="CSV (Type,Date,Time,Name,Duration,Calories) or JSONL file, optionally .gz")
+    parser.add_argument("--data-file", default="exercise_data.json", help="tracker data file (.json, or .db for SQLite)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from file extension)")
+    parser.add_argument("--skip-invalid", action="store_true", help="skip rows that fail validation instead of aborting")
+    parser.add_argument("--estimate-calories", choices=["missing", "all"],
+                        help="estimate exercise calories from MET values for rows without calories, or for every row")
+    parser.add_argument("--weight", type=float, help="body weight in kg for estimates (default: the tracker's saved weight)")
+    args = parser.parse_args(argv)
+
+    errors = []
+    try:
+        data_manager = open_data_manager(args.data_file)
+    except OSError as e:
+        print(f"Import failed, nothing was written: {e}", file=sys.stderr)
+        return 1
+    try:
+        with open_input(args.source) as f:
+            weight = args.weight or data_manager.get_weight()
+            records = iter_records(f, args.format or detect_format(args.source), args.skip_invalid, errors,
+                                   args.estimate_calories, weight)
+            count = data_manager.bulk_add(records)
+    except (OSError, ValueError) as e:
+        print(f"Import failed, nothing was written: {e}", file=sys.stderr)
+        return 1
+    finally:
+        data_manager.close()
+    for number, message in errors:
+        print(f"Skipped row {number}: {message}", file=sys.stderr)
+    print(f"Imported {count} records into {args.data_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
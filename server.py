@@ -0,0 +1,393 @@
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from core import open_data_manager
+from importer import estimate_calories, parse_record
+
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+RECORD_KEYS = {"exercises": "Exercise", "food": "Food"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def query_int(query, name, default, minimum=0, maximum=None):
+    value = query.get(name, [default])[-1]
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be an integer") from None
+    if value < minimum:
+        raise HTTPError(400, f"{name} must be at least {minimum}")
+    return value if maximum is None else min(value, maximum)
+
+
+def page_result(items, offset, limit, total):
+    next_offset = offset + len(items)
+    return {"items": [item.to_dict() for item in items], "offset": offset, "limit": limit, "total": total,
+            "next_offset": next_offset if next_offset < total else None}
+
+
+class TrackerServer:
+    """JSON API over a DataManager.
+
+    The data manager is only touched from one worker thread, so the event loop never blocks on disk and SQLite
+    connections stay on the thread that opened them; every mutation goes through one writer task.
+    """
+
+    def __init__(self, data_manager, host="127.0.0.1", port=8765, max_batch=1000, max_body=1 << 20, max_page=500,
+                 max_days=36600):
+        self.data_manager = data_manager
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.max_body = max_body
+        self.max_page = max_page
+        self.max_days = max_days
+        self.stats = {"requests": 0, "writes": 0, "batches": 0, "records": 0}
+        self._server = None
+        self._writes = None
+        self._writer = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tracker-data")
+
+    def call(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def start(self):
+        self._writes = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self, close_data_manager=False):
+        if self._executor is None:
+            return
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._writer is not None:
+            await self._writes.put(None)
+            await self._writer
+            self._writer = None
+        try:
+            if self.data_manager is not None:
+                await self.call(self.data_manager.close if close_data_manager else self.data_manager.flush)
+        finally:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def _write_loop(self):
+        # Requests that arrive while a batch is being written are coalesced into the next bulk_add call.
+        stopping = False
+        while not stopping:
+            batch = [await self._writes.get()]
+            if batch[0] is None:
+                return
+            count = len(batch[0][0])
+            while count < self.max_batch and not self._writes.empty():
+                item = self._writes.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                count += len(item[0])
+            records = [record for pending, _ in batch for record in pending]
+            try:
+                await self.call(self.data_manager.bulk_add, records)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats["batches"] += 1
+            self.stats["records"] += len(records)
+            for pending, future in batch:
+                if not future.done():
+                    future.set_result(len(pending))
+
+    async def submit(self, records):
+        future = asyncio.get_running_loop().create_future()
+        self.stats["writes"] += 1
+        await self._writes.put((records, future))
+        return await future
+
+    def today(self):
+        # A long-running server must roll the tracker over at midnight just like the GUI's timer does.
+        self.data_manager.roll_over()
+        return self.data_manager.get_current_date()
+
+    def parse_records(self, body, record_type=None):
+        items = body if isinstance(body, list) else [body]
+        if not items:
+            raise HTTPError(400, "No records given")
+        today = self.today()
+        fields = []
+        for index, item in enumerate(items, 1):
+            if not isinstance(item, dict):
+                raise HTTPError(400, f"Record {index}: expected a JSON object")
+            item = dict(item)
+            if record_type is not None:
+                item["type"] = record_type
+            item.setdefault("date", today)
+            item.setdefault("timestamp", datetime.now().strftime("%H:%M"))
+            fields.append(item)
+        estimate_calories(fields, "missing", self.data_manager.get_weight())
+        records = []
+        for index, item in enumerate(fields, 1):
+            try:
+                records.append(parse_record(item))
+            except ValueError as e:
+                raise HTTPError(400, f"Record {index}: {e}") from None
+        return records
+
+    async def add(self, body, record_type=None):
+        records = await self.read(self.parse_records, body, record_type)
+        return 201, {"added": await self.submit(records)}
+
+    def list_records(self, key, query):
+        offset = query_int(query, "offset", 0)
+        limit = query_int(query, "limit", 100, 1, self.max_page)
+        data_manager = self.data_manager
+        if "start" in query or "end" in query:
+            start = query.get("start", [None])[-1]
+            end = query.get("end", [None])[-1] or self.today()
+            if start is None:
+                raise HTTPError(400, "start is required with end")
+            if key == "exercises":
+                fetch = data_manager.get_exercises_between_page
+            else:
+                fetch = data_manager.get_food_intake_between_page
+            items, total = fetch(start, end, offset, limit)
+            return page_result(items, offset, limit, total)
+        if key == "exercises":
+            total, fetch = data_manager.count_exercises(), data_manager.get_exercises_page
+        else:
+            total, fetch = data_manager.count_food_intake(), data_manager.get_food_intake_page
+        return page_result(list(fetch(offset, limit)) if offset < total else [], offset, limit, total)
+
+    def totals(self, query, daily=False):
+        data_manager = self.data_manager
+        today = self.today()
+        if daily or "start" in query:
+            start = query.get("start", [None])[-1]
+            end = query.get("end", [None])[-1] or today
+            if start is None:
+                raise HTTPError(400, "start is required")
+            if daily:
+                return {"days": data_manager.get_daily_totals(start, end)}
+            return data_manager.get_totals_between(start, end)
+        if "days" in query:
+            return data_manager.get_recent_totals(query_int(query, "days", 30, 1, self.max_days))
+        return {
+            "date": today,
+            "today": {"burned": data_manager.get_today_calories_burned(),
+                      "intake": data_manager.get_today_calories_intake()},
+            "burned": data_manager.get_total_calories_burned(),
+            "intake": data_manager.get_total_calories_intake(),
+            "target": data_manager.get_target_calories()
+        }
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = parse_qs(url.query)
+        parts = path.strip("/").split("/")
+        if path == "/records" or (len(parts) == 1 and parts[0] in RECORD_KEYS):
+            if method == "POST":
+                return await self.add(self.decode(body), RECORD_KEYS.get(parts[0]))
+            if method == "GET" and parts[0] in RECORD_KEYS:
+                return 200, await self.read(self.list_records, parts[0], query)
+            raise HTTPError(405, f"{method} is not allowed on {path}")
+        if path in ("/totals", "/totals/daily"):
+            if method != "GET":
+                raise HTTPError(405, f"{method} is not allowed on {path}")
+            return 200, await self.read(self.totals, query, path == "/totals/daily")
+        raise HTTPError(404, f"No such endpoint: {path}")
+
+    async def read(self, fn, *args):
+        try:
+            return await self.call(fn, *args)
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from None
+
+    @staticmethod
+    def decode(body):
+        try:
+            return json.loads(body or b"null")
+        except ValueError:
+            raise HTTPError(400, "Request body must be JSON") from None
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length") from None
+        if length > self.max_body:
+            raise HTTPError(413, f"Request body is larger than {self.max_body} bytes")
+        body = await reader.readexactly(length) if length > 0 else b""
+        keep_alive = headers.get("connection", "").lower() != "close" and version != "HTTP/1.0"
+        return method.upper(), target, body, keep_alive
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, body, keep_alive = request
+                    self.stats["requests"] += 1
+                    status, payload = await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                data = json.dumps(payload).encode()
+                writer.write((f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class ServerThread:
+    """Runs a TrackerServer on its own event loop thread inside another process, such as the GUI.
+
+    The server answers from a DataManager the host application keeps using; the manager's RLock serializes the
+    two threads, so this is for DataManager profiles, not SQLite connections.
+    """
+
+    def __init__(self, data_manager, host="127.0.0.1", port=8765):
+        self.server = TrackerServer(data_manager, host, port)
+        self.error = None
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server.port
+
+    @property
+    def data_manager(self):
+        return self.server.data_manager
+
+    def start(self):
+        started = Future()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._run(started),), name="tracker-server",
+                                        daemon=True)
+        self._thread.start()
+        try:
+            started.result()
+        except BaseException:
+            self._thread.join()
+            self._thread = None
+            raise
+        return self
+
+    async def _run(self, started):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        try:
+            await self.server.start()
+        except BaseException as e:
+            await self.server.close()
+            started.set_exception(e)
+            return
+        started.set_result(self)
+        await self._stopping.wait()
+        try:
+            await self.server.close()
+        except Exception as e:
+            self.error = e
+
+    def set_data_manager(self, data_manager):
+        if self._thread is None:
+            self.server.data_manager = data_manager
+            return
+        # Swapped on the data worker, so calls already queued still finish against the old profile.
+        asyncio.run_coroutine_threadsafe(self._swap(data_manager), self._loop).result()
+
+    async def _swap(self, data_manager):
+        await self.server.call(setattr, self.server, "data_manager", data_manager)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join()
+        self._thread = None
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+
+async def serve(data_file, host, port):
+    server = TrackerServer(None, host, port)
+    try:
+        server.data_manager = await server.call(open_data_manager, data_file)
+        await server.start()
+        print(f"Serving {data_file} on http://{server.host}:{server.port}", file=sys.stderr)
+        await server.serve_forever()
+    finally:
+        await server.close(close_data_manager=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the tracker's history as a local JSON API.")
+    parser.add_argument("--data-file", default="exercise_data.json",
+                        help="tracker data file (.json, or .db for SQLite); while the GUI has a .json file open, "
+                             "use its File > Serve Local API option instead")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (use 0.0.0.0 for the LAN)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.data_file, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Server failed: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
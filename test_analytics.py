@@ -0,0 +1,75 @@
+import os
+import unittest
+from analytics import HistoryAnalytics, percentile
+from main import Exercise, Food, RecordColumns, SQLiteDataManager
+
+class TestHistoryAnalytics(unittest.TestCase):
+    def setUp(self):
+        exercises = RecordColumns(Exercise)
+        for record in (
+            Exercise("Run", 30, 300, "30/12/2024", "07:00"),
+            Exercise("Run", 20, 200, "01/01/2025", "07:00"),
+            Exercise("Swim", 40, 400, "01/01/2025", "18:00"),
+            Exercise("Run", 10, 100, "06/01/2025", "07:00"),
+            Exercise("Undated", 10, 100, "", "07:00"),
+        ):
+            exercises.append(record)
+        food = RecordColumns(Food)
+        food.append(Food("Pasta", 900, "01/01/2025", "13:00"))
+        food.append(Food("Salad", 300, "02/01/2025", "13:00"))
+        self.analytics = HistoryAnalytics(exercises, food)
+
+    def test_daily_aggregate(self):
+        rows = self.analytics.aggregate("exercises", by="day")
+        self.assertEqual([row["key"] for row in rows], ["30/12/2024", "01/01/2025", "06/01/2025"])
+        self.assertEqual(rows[1]["count"], 2)
+        self.assertEqual(rows[1]["sum"], 600)
+        self.assertEqual(rows[1]["mean"], 300)
+        self.assertEqual(rows[1]["p50"], 300)
+
+    def test_weekly_and_monthly_aggregate(self):
+        weeks = self.analytics.aggregate("exercises", by="week", field="duration")
+        self.assertEqual([(row["key"], row["sum"]) for row in weeks], [("2025-W01", 90), ("2025-W02", 10)])
+        months = self.analytics.aggregate("exercises", by="month")
+        self.assertEqual([(row["key"], row["sum"]) for row in months], [("12/2024", 300), ("01/2025", 700)])
+
+    def test_aggregate_by_name_includes_undated_records(self):
+        rows = {row["key"]: row for row in self.analytics.aggregate("exercises", by="name")}
+        self.assertEqual(rows["Run"]["count"], 3)
+        self.assertEqual(rows["Run"]["max"], 300)
+        self.assertIn("Undated", rows)
+
+    def test_food_has_no_duration(self):
+        with self.assertRaises(ValueError):
+            self.analytics.aggregate("food_intake", field="duration")
+
+    def test_rolling_net_balance(self):
+        rows = self.analytics.rolling_net_balance(window=2)
+        self.assertEqual(rows[0]["date"], "30/12/2024")
+        self.assertEqual(len(rows), 8)
+        by_date = {row["date"]: row for row in rows}
+        self.assertEqual(by_date["01/01/2025"]["net"], 300)
+        self.assertEqual(by_date["02/01/2025"]["rolling_net"], 600)
+
+    def test_percentile_interpolates(self):
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2.5)
+        self.assertEqual(percentile([], 90), 0.0)
+
+    def test_from_sqlite_data_manager(self):
+        data_manager = SQLiteDataManager("test_analytics.db")
+        try:
+            for column in self.analytics.columns["exercises"]:
+                data_manager.add_exercise(column)
+            data_manager.add_food(Food("Pasta", 900, "01/01/2025", "13:00"))
+            analytics = HistoryAnalytics.from_data_manager(data_manager)
+            rows = analytics.aggregate("exercises", by="name")
+            self.assertEqual({row["key"]: row["sum"] for row in rows}, {"Run": 600, "Swim": 400, "Undated": 100})
+            self.assertEqual(len(analytics.columns["food_intake"]), 1)
+        finally:
+            data_manager.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists("test_analytics.db" + suffix):
+                    os.remove("test_analytics.db" + suffix)
+
+if __name__ == "__main__":
+    unittest.main()
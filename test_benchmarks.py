@@ -0,0 +1,39 @@
+import unittest
+
+from benchmarks import ENGINES, bench_suite, compare, synthetic_history
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_synthetic_history_is_reproducible(self):
+        data = synthetic_history(100)
+        self.assertEqual(len(data["exercises"]) + len(data["food_intake"]), 100)
+        self.assertEqual(data, synthetic_history(100))
+
+    def test_suite_times_every_engine(self):
+        results = bench_suite([50], repeat=1, ops=2)
+        self.assertEqual([result["engine"] for result in results], list(ENGINES))
+        for result in results:
+            self.assertEqual(result["records"], 50)
+            for metric in ("load_s", "get_exercises_s", "format_screen_s", "format_history_s", "export_csv_s",
+                           "add_exercise_s", "add_food_s", "clear_exercises_s", "clear_food_s"):
+                self.assertGreaterEqual(result[metric], 0.0)
+
+    def test_compare_flags_regressions_above_threshold(self):
+        baseline = [{"engine": "json", "records": 1000, "load_s": 0.5, "add_exercise_s": 0.01, "file_bytes": 10}]
+        results = [{"engine": "json", "records": 1000, "load_s": 1.0, "add_exercise_s": 0.011, "file_bytes": 99},
+                    {"engine": "sqlite", "records": 1000, "load_s": 9.0}]
+        rows = {row["metric"]: row for row in compare(results, baseline, threshold=1.2)}
+        self.assertEqual(set(rows), {"load_s", "add_exercise_s"})
+        self.assertTrue(rows["load_s"]["regression"])
+        self.assertAlmostEqual(rows["load_s"]["ratio"], 2.0)
+        self.assertFalse(rows["add_exercise_s"]["regression"])
+
+    def test_compare_ignores_slowdowns_within_noise(self):
+        baseline = [{"engine": "journal", "records": 10, "add_food_s": 0.0001}]
+        results = [{"engine": "journal", "records": 10, "add_food_s": 0.0003}]
+        self.assertFalse(compare(results, baseline)[0]["regression"])
+        self.assertTrue(compare(results, baseline, noise=0.0)[0]["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import csv
+import io
+import math
+import os
+import unittest
+
+from bmi_batch import main
+from core import BMICalculatorService
+
+
+class TestBMIBatch(unittest.TestCase):
+    def tearDown(self):
+        for name in ("test_roster.csv", "test_roster_bmi.csv"):
+            if os.path.exists(name):
+                os.remove(name)
+
+    def test_batch_matches_scalar_service(self):
+        heights = [180, "165.5", 150, 190]
+        weights = [80, "50", 75, 120.5]
+        bmis, valid = BMICalculatorService.calculate_bmi_batch(heights, weights)
+        self.assertEqual(list(valid), [1, 1, 1, 1])
+        for bmi, height, weight in zip(bmis, heights, weights):
+            scalar = BMICalculatorService.calculate_bmi(height, weight)
+            self.assertAlmostEqual(bmi, scalar)
+        self.assertEqual(BMICalculatorService.get_bmi_category_batch(bmis, valid),
+                         [BMICalculatorService.get_bmi_category(bmi) for bmi in bmis])
+
+    def test_invalid_rows_are_masked(self):
+        bmis, valid = BMICalculatorService.calculate_bmi_batch(["", "abc", None, -170, 170, "nan", 170],
+                                                               [70, 70, 70, 70, 0, 70, "70"])
+        self.assertEqual(list(valid), [0, 0, 0, 0, 0, 0, 1])
+        self.assertTrue(all(math.isnan(bmi) for bmi in bmis[:6]))
+        self.assertEqual(BMICalculatorService.get_bmi_category_batch(bmis, valid)[5:], ["Invalid", "Normal weight"])
+
+    def test_category_boundaries(self):
+        bmis = [18.49, 18.5, 24.99, 25, 29.99, 30]
+        labels = BMICalculatorService.get_bmi_category_batch(bmis, bytes([1] * len(bmis)))
+        self.assertEqual(labels, [BMICalculatorService.get_bmi_category(bmi) for bmi in bmis])
+
+    def test_length_mismatch_raises(self):
+        with self.assertRaises(ValueError):
+            BMICalculatorService.calculate_bmi_batch([180, 170], [80])
+
+    def test_process_csv_in_chunks(self):
+        source = io.StringIO("member,height_cm,weight_kg\na,180,80\nb,,60\nc,160\nd,160,65\n")
+        target = io.StringIO()
+        total, invalid = BMICalculatorService.process_csv(source, target, chunk_size=2)
+        self.assertEqual((total, invalid), (4, 2))
+        rows = list(csv.reader(io.StringIO(target.getvalue())))
+        self.assertEqual(rows[0], ["member", "height_cm", "weight_kg", "bmi", "category"])
+        self.assertEqual(rows[1][3:], ["24.69", "Normal weight"])
+        self.assertEqual(rows[2][3:], ["", "Invalid"])
+        self.assertEqual(rows[3][3:], ["", "Invalid"])
+        self.assertEqual(rows[4][3:], ["25.39", "Overweight"])
+
+    def test_process_csv_requires_columns(self):
+        with self.assertRaises(ValueError):
+            BMICalculatorService.process_csv(io.StringIO("height,weight\n180,80\n"), io.StringIO())
+
+    def test_command_writes_output_file(self):
+        with open("test_roster.csv", "w", newline="") as f:
+            f.write("name,h,w\nx,200,100\n")
+        self.assertEqual(main(["test_roster.csv", "-o", "test_roster_bmi.csv", "--height-column", "h",
+                               "--weight-column", "w"]), 0)
+        with open("test_roster_bmi.csv", newline="") as f:
+            self.assertEqual(list(csv.reader(f))[1], ["x", "200", "100", "25.00", "Overweight"])
+        self.assertEqual(main(["test_roster.csv"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
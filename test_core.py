@@ -0,0 +1,48 @@
+import json
+import subprocess
+import sys
+import unittest
+
+
+IMPORT_BUDGET_S = 1.0
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "tkinter": "tkinter" in sys.modules}}))
+"""
+
+
+def probe_import(module):
+    output = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output)
+
+
+class TestHeadlessImport(unittest.TestCase):
+    def test_core_does_not_load_tkinter(self):
+        result = probe_import("core")
+        self.assertFalse(result["tkinter"])
+        self.assertLess(result["elapsed"], IMPORT_BUDGET_S)
+
+    def test_main_defers_gui_import(self):
+        result = probe_import("main")
+        self.assertFalse(result["tkinter"])
+        self.assertLess(result["elapsed"], IMPORT_BUDGET_S)
+
+    def test_headless_tools_do_not_load_tkinter(self):
+        for module in ("analytics", "importer", "benchmarks"):
+            with self.subTest(module=module):
+                self.assertFalse(probe_import(module)["tkinter"])
+
+    def test_main_resolves_gui_names_lazily(self):
+        import main
+        self.assertEqual(main.DataManager.__module__, "core")
+        with self.assertRaises(AttributeError):
+            main.NotARealName
+
+
+if __name__ == "__main__":
+    unittest.main()
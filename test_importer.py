@@ -0,0 +1,127 @@
+import io
+import os
+import unittest
+from importer import iter_records, main
+from main import DataExporter, DataManager, Exercise, Food, open_data_manager
+from test_main import remove_data_files
+
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_import_data.json"
+
+    def tearDown(self):
+        remove_data_files(self.data_file, "test_import.csv", "test_import.jsonl")
+
+    def open_manager(self):
+        return open_data_manager(self.data_file)
+
+    def test_csv_round_trip_from_export(self):
+        source = DataManager(data_file=self.data_file)
+        source.add_exercise(Exercise("Push, ups", 10, 80, "01/01/2025", "07:00"))
+        source.add_food(Food("Oats", 300, "01/01/2025", "08:00"))
+        DataExporter.export_csv(source, "test_import.csv")
+        source.reset_all()
+        self.assertEqual(main(["test_import.csv", "--data-file", self.data_file]), 0)
+        data_manager = self.open_manager()
+        self.assertEqual(data_manager.get_exercises()[0].name, "Push, ups")
+        self.assertEqual(data_manager.get_total_calories_burned(), 80)
+        self.assertEqual(data_manager.get_total_calories_intake(), 300)
+        data_manager.close()
+
+    def test_invalid_row_aborts_without_writing(self):
+        with open("test_import.jsonl", "w") as f:
+            f.write('{"type": "Food", "name": "Rice", "calories": 200, "date": "01/01/2025", "timestamp": "12:00"}\n')
+            f.write('{"type": "Exercise", "name": "Run", "duration": -5, "calories": 100}\n')
+        self.assertEqual(main(["test_import.jsonl", "--data-file", self.data_file]), 1)
+        self.assertFalse(os.path.exists(self.data_file + ".journal"))
+        self.assertEqual(main(["test_import.jsonl", "--data-file", self.data_file, "--skip-invalid"]), 0)
+        data_manager = self.open_manager()
+        self.assertEqual(data_manager.count_food_intake(), 1)
+        self.assertEqual(data_manager.count_exercises(), 0)
+        data_manager.close()
+
+    def test_imports_into_day_partitioned_history(self):
+        data_manager = open_data_manager(self.data_file)
+        data_manager.add_exercise(Exercise("Old run", 30, 300, "01/01/2020", "07:00"))
+        data_manager.add_food(Food("Toast", 120, data_manager.get_current_date(), "08:00"))
+        data_manager.save_data()
+        data_manager.close()
+        with open("test_import.jsonl", "w") as f:
+            f.write('{"name": "Swim", "duration": 20, "calories": 150, "date": "02/01/2020", "timestamp": "07:00"}\n')
+        self.assertEqual(main(["test_import.jsonl", "--data-file", self.data_file]), 0)
+        self.assertTrue(os.path.isdir(self.data_file + ".days"))
+        data_manager = self.open_manager()
+        self.assertEqual([e.name for e in data_manager.iter_exercises()], ["Old run", "Swim"])
+        self.assertEqual(data_manager.get_total_calories_burned(), 450)
+        self.assertEqual(data_manager.count_food_intake(), 1)
+        data_manager.close()
+
+    def test_refuses_a_data_file_in_use(self):
+        with open("test_import.jsonl", "w") as f:
+            f.write('{"name": "Rice", "calories": 200, "date": "01/01/2025", "timestamp": "12:00"}\n')
+        data_manager = self.open_manager()
+        try:
+            self.assertEqual(main(["test_import.jsonl", "--data-file", self.data_file]), 1)
+        finally:
+            data_manager.close()
+        self.assertEqual(main(["test_import.jsonl", "--data-file", self.data_file]), 0)
+
+    def test_iter_records_collects_errors(self):
+        source = io.StringIO('{"name": "Row", "duration": 10, "calories": 90, "date": "01/01/2025", "timestamp": "07:00"}\n'
+                             'not json\n{"name": "", "calories": 5}\n')
+        errors = []
+        records = list(iter_records(source, "jsonl", skip_invalid=True, errors=errors))
+        self.assertEqual([type(r).__name__ for r in records], ["Exercise"])
+        self.assertEqual([number for number, _ in errors], [2, 3])
+
+    def test_dates_and_times_are_validated(self):
+        rows = ['{"name": "Rice", "calories": 200, "date": "%s", "timestamp": "%s"}' % when for when in
+                [("1/2/2025", "7:05"), ("2025-02-01", "12:00"), ("", "12:00"), ("31/02/2025", "12:00"), ("01/02/2025", "25:99")]]
+        errors = []
+        records = list(iter_records(io.StringIO("\n".join(rows)), "jsonl", skip_invalid=True, errors=errors))
+        self.assertEqual([(r.date, r.timestamp) for r in records], [("01/02/2025", "07:05")])
+        self.assertEqual([number for number, _ in errors], [2, 3, 4, 5])
+
+    def test_estimates_missing_exercise_calories(self):
+        source = io.StringIO("Type,Date,Time,Name,Duration,Calories\n"
+                             "Exercise,01/01/2025,07:00,Running,30,\n"
+                             "Exercise,01/01/2025,08:00,Yoga,60,999\n"
+                             "Exercise,01/01/2025,09:00,Chess,60,\n"
+                             "Food,01/01/2025,12:00,Rice,,200\n")
+        errors = []
+        records = list(iter_records(source, "csv", skip_invalid=True, errors=errors, estimate="missing",
+                                    weight_kg=80, chunk_size=2))
+        self.assertEqual([(r.name, r.calories) for r in records], [("Running", 392.0), ("Yoga", 999.0), ("Rice", 200.0)])
+        self.assertEqual([number for number, _ in errors], [3])
+        source.seek(0)
+        records = list(iter_records(source, "csv", skip_invalid=True, estimate="all", weight_kg=80))
+        self.assertEqual(records[1].calories, 200.0)
+
+    def test_command_estimates_with_saved_weight(self):
+        data_manager = self.open_manager()
+        data_manager.set_weight(60)
+        data_manager.close()
+        with open("test_import.jsonl", "w") as f:
+            f.write('{"name": "Swimming", "duration": 30, "date": "01/01/2025", "timestamp": "07:00"}\n')
+        self.assertEqual(main(["test_import.jsonl", "--data-file", self.data_file]), 1)
+        self.assertEqual(main(["test_import.jsonl", "--data-file", self.data_file, "--estimate-calories", "missing"]), 0)
+        data_manager = self.open_manager()
+        self.assertEqual(data_manager.get_exercises()[0].calories, 180.0)
+        data_manager.close()
+
+    def test_bulk_add_is_one_journal_write_and_validates(self):
+        data_manager = self.open_manager()
+        with self.assertRaises(ValueError):
+            data_manager.bulk_add([Food("Ok", 10, "01/01/2025", "12:00"), Food("Bad", 0, "01/01/2025", "12:00")])
+        self.assertEqual(data_manager.count_food_intake(), 0)
+        count = data_manager.bulk_add([Food("Ok", 10, "01/01/2025", "12:00"), Exercise("Jog", 5, 40, "01/01/2025", "07:00")])
+        self.assertEqual(count, 2)
+        self.assertEqual(data_manager.get_total_calories_intake(), 10)
+        data_manager.close()
+        data_manager = self.open_manager()
+        self.assertEqual(data_manager.count_exercises(), 1)
+        self.assertEqual(data_manager.get_total_calories_burned(), 40)
+        data_manager.close()
+
+if __name__ == "__main__":
+    unittest.main()
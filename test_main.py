@@ -1,6 +1,22 @@
+import glob
+import json
+import os
+import shutil
 import unittest
-from datetime import datetime
-from main import DataManager, Exercise, Food
+from datetime import datetime, timedelta
+from main import (BinaryJournalStorage, BinarySnapshot, BinaryStorage, CalorieEstimator, CalorieNeedsService, DailyTotalsIndex, DataExporter,
+                  DayPartitionedStorage, NameIndex, DataManager, DurabilityPolicy, Exercise, Food,
+                  Instrumentation, JournalStorage, METCatalog, JsonStorage, MappedRecords, PagedRowCache, ProfileManager, RecordColumns, RecordDicts,
+                  SQLiteDataManager, StorageLayoutError,
+                  convert_snapshot, instrumentation, open_data_manager)
+
+def remove_data_files(*paths):
+    for path in paths:
+        for name in glob.glob(glob.escape(path) + "*"):
+            if os.path.isdir(name):
+                shutil.rmtree(name)
+            else:
+                os.remove(name)
 
 class TestDataManager(unittest.TestCase):
     def setUp(self):
@@ -9,9 +25,7 @@ class TestDataManager(unittest.TestCase):
         self.data_manager.reset_all()
 
     def tearDown(self):
-        import os
-        if os.path.exists("test_exercise_data.json"):
-            os.remove("test_exercise_data.json")
+        remove_data_files("test_exercise_data.json")
 
     def test_add_exercise(self):
         exercise = Exercise("Test Exercise", 30, 200, "01/01/2025", "12:00")
@@ -43,6 +57,45 @@ class TestDataManager(unittest.TestCase):
         self.assertEqual(len(self.data_manager.get_food_intake()), 0)
         self.assertEqual(self.data_manager.get_total_calories_intake(), 0)
 
+    def test_record_views_are_cached_and_extended(self):
+        self.data_manager.add_exercise(Exercise("A", 5, 50, "01/01/2025", "14:00"))
+        first = self.data_manager.get_exercises()
+        self.data_manager.add_exercise(Exercise("B", 5, 60, "01/01/2025", "14:10"))
+        second = self.data_manager.get_exercises()
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 2)
+        self.assertEqual(first[0].to_dict(), second[0].to_dict())
+        self.assertGreater(second.version, first.version)
+        self.assertEqual([e.name for e in reversed(second)], ["B", "A"])
+
+    def test_record_view_is_read_only(self):
+        self.data_manager.add_food(Food("Tea", 5, "01/01/2025", "15:00"))
+        foods = self.data_manager.get_food_intake()
+        with self.assertRaises(TypeError):
+            foods[0] = None
+        self.data_manager.clear_food()
+        self.assertEqual(len(foods), 1)
+        self.assertEqual(len(self.data_manager.get_food_intake()), 0)
+
+    def test_record_view_generation_changes_only_on_clear(self):
+        start = self.data_manager.get_exercises().generation
+        self.data_manager.add_exercise(Exercise("A", 5, 50, "01/01/2025", "14:00"))
+        self.assertEqual(self.data_manager.get_exercises().generation, start)
+        self.data_manager.clear_exercises()
+        self.assertNotEqual(self.data_manager.get_exercises().generation, start)
+
+    def test_pages_and_counts(self):
+        for i in range(5):
+            self.data_manager.add_food(Food(f"Item {i}", 10 + i, "01/01/2025", "12:00"))
+        self.assertEqual(self.data_manager.count_food_intake(), 5)
+        self.assertEqual([f.name for f in self.data_manager.get_food_intake_page(3, 10)], ["Item 3", "Item 4"])
+
+    def test_get_exercises_between(self):
+        self.data_manager.add_exercise(Exercise("Old", 5, 50, "31/12/2024", "14:00"))
+        self.data_manager.add_exercise(Exercise("New", 5, 50, "02/01/2025", "14:00"))
+        found = self.data_manager.get_exercises_between("01/01/2025", "31/01/2025")
+        self.assertEqual([e.name for e in found], ["New"])
+
     def test_reset_all(self):
         self.data_manager.add_exercise(Exercise("Ex", 5, 50, "01/01/2025", "14:00"))
         self.data_manager.add_food(Food("Fd", 100, "01/01/2025", "14:05"))
@@ -52,5 +105,981 @@ class TestDataManager(unittest.TestCase):
         self.assertEqual(self.data_manager.get_total_calories_burned(), 0)
         self.assertEqual(self.data_manager.get_total_calories_intake(), 0)
 
+class TestJournalStorage(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_journal_data.json"
+        self.data_manager = DataManager(storage=JournalStorage(self.data_file, compact_every=3))
+
+    def tearDown(self):
+        self.data_manager.close()
+        remove_data_files(self.data_file)
+
+    def reopen(self):
+        self.data_manager.close()
+        self.data_manager = DataManager(storage=JournalStorage(self.data_file, compact_every=3))
+
+    def test_add_appends_one_journal_line(self):
+        self.data_manager.add_exercise(Exercise("Run", 30, 300, "01/01/2025", "08:00"))
+        self.data_manager.add_food(Food("Apple", 95, "01/01/2025", "09:00"))
+        with open(self.data_file + ".journal") as f:
+            self.assertEqual(len(f.readlines()), 2)
+        self.reopen()
+        self.assertEqual(self.data_manager.get_exercises()[0].name, "Run")
+        self.assertEqual(self.data_manager.get_food_intake()[0].name, "Apple")
+        self.assertEqual(self.data_manager.get_total_calories_burned(), 300)
+        self.assertEqual(self.data_manager.get_total_calories_intake(), 95)
+
+    def test_compaction_writes_snapshot_and_truncates_journal(self):
+        for i in range(4):
+            self.data_manager.add_exercise(Exercise(f"Ex {i}", 10, 100, "01/01/2025", "10:00"))
+        with open(self.data_file + ".journal") as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.reopen()
+        self.assertEqual(len(self.data_manager.get_exercises()), 4)
+        self.assertEqual(self.data_manager.get_total_calories_burned(), 400)
+
+    def test_clear_is_replayed(self):
+        self.data_manager.add_food(Food("Bread", 200, "01/01/2025", "07:00"))
+        self.data_manager.clear_food()
+        self.reopen()
+        self.assertEqual(len(self.data_manager.get_food_intake()), 0)
+        self.assertEqual(self.data_manager.get_total_calories_intake(), 0)
+
+    def test_stale_journal_entries_are_skipped(self):
+        for i in range(3):
+            self.data_manager.add_exercise(Exercise(f"Ex {i}", 10, 100, "01/01/2025", "10:00"))
+        self.data_manager.close()
+        with open(self.data_file + ".journal", "w") as f:
+            f.write('{"seq": 1, "op": "add_exercise", "record": {"name": "Ex 0", "calories": 100}}\n')
+        self.reopen()
+        self.assertEqual(len(self.data_manager.get_exercises()), 3)
+
+    def test_torn_tail_is_truncated_before_new_appends(self):
+        def reopen():
+            self.data_manager.close()
+            self.data_manager = DataManager(storage=JournalStorage(self.data_file))
+        reopen()
+        self.data_manager.add_exercise(Exercise("A", 10, 100, "01/01/2025", "10:00"))
+        self.data_manager.close()
+        with open(self.data_file + ".journal", "a") as f:
+            f.write('{"seq": 2, "op": "add_exer')
+        reopen()
+        self.data_manager.add_exercise(Exercise("C", 10, 100, "01/01/2025", "11:00"))
+        self.data_manager.add_exercise(Exercise("D", 10, 100, "01/01/2025", "12:00"))
+        reopen()
+        self.assertEqual([e.name for e in self.data_manager.get_exercises()], ["A", "C", "D"])
+        self.assertEqual(self.data_manager.get_total_calories_burned(), 300)
+
+class TestRecordColumns(unittest.TestCase):
+    def test_round_trip_matches_dict_format(self):
+        items = [
+            {"name": "Run", "duration": 30, "calories": 250.5, "date": "01/01/2025", "timestamp": "07:05"},
+            {"name": "Run", "duration": 12.5, "calories": 100, "date": "02/01/2025", "timestamp": "23:59"},
+            {"name": "Odd", "duration": "10", "calories": 50, "date": "2025-01-03", "timestamp": "7pm"},
+            {"name": "Sparse"},
+        ]
+        columns = RecordColumns.from_dicts(Exercise, items)
+        expected = [Exercise.from_dict(item).to_dict() for item in items]
+        self.assertEqual(columns.to_dicts(), expected)
+        self.assertEqual([type(v) for v in columns.to_dicts()[0].values()],
+                         [type(v) for v in expected[0].values()])
+        self.assertEqual(columns.strings, ["Run", "Odd", "Sparse"])
+
+    def test_food_columns(self):
+        columns = RecordColumns(Food)
+        columns.append(Food("Pear", 60, "05/05/2025", "10:00"))
+        self.assertEqual(columns[0].to_dict(), Food("Pear", 60, "05/05/2025", "10:00").to_dict())
+        self.assertEqual(list(columns.calories), [60.0])
+
+    def test_manager_holds_records_only_as_columns(self):
+        items = [{"name": "Run", "duration": 30, "calories": 250.5, "date": "01/01/2025", "timestamp": "07:05"},
+                 {"name": "Odd", "duration": "10", "calories": 50, "date": "31/02/2025", "timestamp": "7pm"}]
+        records = RecordDicts.from_dicts(Exercise, items)
+        self.assertEqual(records, [Exercise.from_dict(item).to_dict() for item in items])
+        self.assertEqual(records[-1]["timestamp"], "7pm")
+        self.assertEqual(json.loads(json.dumps({"exercises": records}, default=list))["exercises"], list(records))
+        data_manager = DataManager(storage=JournalStorage("test_columns_data.json"))
+        try:
+            data_manager.add_exercise(Exercise("Run", 30, 250, "01/01/2025", "07:05"))
+            self.assertIsInstance(data_manager.data["exercises"], RecordDicts)
+            self.assertIs(data_manager.get_exercise_columns(), data_manager.data["exercises"].columns)
+            data_manager.save_data()
+            with open("test_columns_data.json") as f:
+                self.assertEqual(json.load(f)["exercises"][0]["name"], "Run")
+        finally:
+            data_manager.close()
+            remove_data_files("test_columns_data.json")
+
+    def test_records_use_slots(self):
+        self.assertFalse(hasattr(Exercise("Run", 1, 1, "", ""), "__dict__"))
+        self.assertFalse(hasattr(Food("Pear", 1, "", ""), "__dict__"))
+
+class TestPagedRowCache(unittest.TestCase):
+    def setUp(self):
+        self.records = [Food(f"Food {i}", i, "01/01/2025", "12:00") for i in range(50)]
+        self.fetches = []
+
+        def fetch(offset, limit):
+            self.fetches.append(offset)
+            return self.records[offset:offset + limit]
+
+        self.cache = PagedRowCache(fetch, page_size=10, capacity=20)
+
+    def test_newest_first_window(self):
+        rows = self.cache.newest_first(0, 3, len(self.records))
+        self.assertEqual(rows, [r.get_summary() for r in self.records[49:46:-1]])
+        self.assertEqual(self.fetches, [40])
+
+    def test_pages_are_fetched_once_and_capacity_is_bounded(self):
+        self.cache.newest_first(0, 5, 50)
+        self.cache.newest_first(2, 5, 50)
+        self.assertEqual(self.fetches, [40])
+        self.cache.newest_first(20, 25, 50)
+        self.assertLessEqual(len(self.cache), 20)
+
+class TestBackgroundPersistence(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_background_data.json"
+
+    def tearDown(self):
+        remove_data_files(self.data_file)
+
+    def test_writes_are_coalesced_and_flushed(self):
+        writes = []
+        storage = JournalStorage(self.data_file)
+        original = storage.append_many
+        storage.append_many = lambda entries, data: (writes.append(len(entries)), original(entries, data))
+        data_manager = DataManager(storage=storage, background=True, flush_latency=5)
+        for i in range(20):
+            data_manager.add_exercise(Exercise(f"Set {i}", 1, 10, "01/01/2025", "09:00"))
+        data_manager.flush()
+        self.assertEqual(writes, [20])
+        data_manager.close()
+        reopened = DataManager(storage=JournalStorage(self.data_file))
+        self.assertEqual(reopened.count_exercises(), 20)
+        self.assertEqual(reopened.get_total_calories_burned(), 200)
+        reopened.close()
+
+    def test_close_persists_pending_snapshot(self):
+        data_manager = DataManager(data_file=self.data_file, background=True, flush_latency=5)
+        data_manager.add_food(Food("Soup", 180, "01/01/2025", "19:00"))
+        data_manager.close()
+        self.assertEqual(DataManager(data_file=self.data_file).get_total_calories_intake(), 180)
+
+    def test_failed_write_is_retried_and_reported(self):
+        storage = JournalStorage(self.data_file)
+        original = storage.append_many
+        failures = []
+
+        def append_many(entries, data):
+            if failures:
+                raise failures.pop()
+            original(entries, data)
+        storage.append_many = append_many
+        data_manager = DataManager(storage=storage, background=True, flush_latency=5)
+        data_manager.add_exercise(Exercise("Row", 10, 90, "01/01/2025", "09:00"))
+        failures.append(OSError("disk full"))
+        with self.assertRaises(OSError):
+            data_manager.flush()
+        data_manager.add_exercise(Exercise("Lift", 20, 120, "01/01/2025", "10:00"))
+        data_manager.close()
+        reopened = DataManager(storage=JournalStorage(self.data_file))
+        self.assertEqual([e.name for e in reopened.get_exercises()], ["Row", "Lift"])
+        reopened.close()
+
+class TestCrashSafeSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_snapshot_data.json"
+
+    def tearDown(self):
+        remove_data_files(self.data_file)
+
+    def test_save_keeps_backup_generations(self):
+        data_manager = DataManager(storage=JsonStorage(self.data_file, backups=2))
+        for calories in (100, 200, 300):
+            data_manager.add_food(Food("Meal", calories, "01/01/2025", "12:00"))
+        self.assertFalse(os.path.exists(self.data_file + ".tmp"))
+        with open(self.data_file + ".bak1") as f:
+            self.assertIn('"total_calories_intake": 300', f.read())
+        with open(self.data_file + ".bak2") as f:
+            self.assertIn('"total_calories_intake": 100', f.read())
+
+    def test_truncated_snapshot_falls_back_to_backup(self):
+        data_manager = DataManager(data_file=self.data_file)
+        data_manager.add_food(Food("Meal", 100, "01/01/2025", "12:00"))
+        data_manager.add_food(Food("Meal", 150, "01/01/2025", "13:00"))
+        with open(self.data_file) as f:
+            content = f.read()
+        with open(self.data_file, "w") as f:
+            f.write(content[:len(content) // 2])
+        restored = DataManager(data_file=self.data_file)
+        self.assertEqual(restored.get_total_calories_intake(), 100)
+
+    def test_unreadable_history_is_quarantined_not_overwritten(self):
+        with open(self.data_file, "w") as f:
+            f.write('{"exercises": [')
+        data_manager = DataManager(data_file=self.data_file)
+        self.assertEqual(data_manager.count_exercises(), 0)
+        self.assertFalse(os.path.exists(self.data_file))
+        quarantined = glob.glob(self.data_file + ".corrupt-*")
+        self.assertEqual(len(quarantined), 1)
+        with open(quarantined[0]) as f:
+            self.assertEqual(f.read(), '{"exercises": [')
+
+    def test_durability_policies(self):
+        every_third = DurabilityPolicy.every(3)
+        self.assertEqual([every_third.should_sync() for _ in range(6)], [False, False, True, False, False, True])
+        self.assertTrue(all(DurabilityPolicy.always().should_sync() for _ in range(3)))
+        self.assertFalse(DurabilityPolicy.never().should_sync())
+        self.assertTrue(DurabilityPolicy.interval(0).should_sync())
+        self.assertFalse(DurabilityPolicy.interval(60000).should_sync())
+
+class TestDayPartitionedStorage(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_days.json"
+        self.today = datetime.now().strftime("%d/%m/%Y")
+        self.days = [(datetime.now() - timedelta(days=n)).strftime("%d/%m/%Y") for n in (3, 2, 1)]
+
+    def tearDown(self):
+        remove_data_files(self.data_file)
+
+    def open(self, **kwargs):
+        return DataManager(self.data_file, storage=DayPartitionedStorage(self.data_file, **kwargs))
+
+    def seed(self):
+        data_manager = self.open()
+        for day in self.days:
+            data_manager.add_exercise(Exercise(f"Run {day}", 30, 100, day, "08:00"))
+            data_manager.add_food(Food(f"Soup {day}", 300, day, "12:00"))
+        data_manager.add_exercise(Exercise("Swim", 45, 400, self.today, "07:00"))
+        data_manager.add_exercise(Exercise("Undated", 10, 10, "someday", "07:00"))
+        data_manager.save_data()
+        data_manager.close()
+
+    def test_writes_one_segment_per_day(self):
+        self.seed()
+        segments = sorted(os.listdir(self.data_file + ".days"))
+        self.assertEqual(len(segments), 5)
+        self.assertIn("undated.json", segments)
+        with open(self.data_file) as f:
+            meta = json.load(f)
+        self.assertNotIn("exercises", meta)
+        self.assertEqual(sum(counts[0] for counts in meta["days"].values()), 5)
+
+    def test_only_today_is_loaded_at_startup(self):
+        self.seed()
+        data_manager = self.open()
+        self.assertEqual([item["name"] for item in data_manager.data["exercises"]], ["Swim"])
+        self.assertEqual(data_manager.data["food_intake"], [])
+        self.assertTrue(data_manager.has_pending_history())
+        self.assertEqual(data_manager.count_exercises(), 5)
+        self.assertEqual(data_manager.count_food_intake(), 3)
+        names = [e.name for e in data_manager.get_exercises_page(0, 10)]
+        self.assertEqual(names, ["Undated"] + [f"Run {day}" for day in self.days] + ["Swim"])
+        self.assertEqual([f.name for f in data_manager.get_food_intake_page(1, 1)], [f"Soup {self.days[1]}"])
+        found = data_manager.get_exercises_between(self.days[1], self.today)
+        self.assertEqual([e.name for e in found], [f"Run {self.days[1]}", f"Run {self.days[2]}", "Swim"])
+        reads = []
+        segment = data_manager.storage.segment
+        data_manager.storage.segment = lambda name: reads.append(name) or segment(name)
+        page, total = data_manager.get_exercises_between_page(self.days[1], self.today, 1, 2)
+        self.assertEqual(([e.name for e in page], total), ([f"Run {self.days[2]}", "Swim"], 3))
+        self.assertEqual(reads, [datetime.strptime(self.days[2], "%d/%m/%Y").strftime("%Y-%m-%d")])
+        del data_manager.storage.segment
+        self.assertTrue(data_manager.has_pending_history())
+        with self.assertRaises(ValueError):
+            data_manager.get_food_intake_between("soon", self.today)
+        self.assertEqual([e.name for e in data_manager.get_exercises()], names)
+        self.assertFalse(data_manager.has_pending_history())
+        data_manager.close()
+
+    def test_appends_to_past_days_and_clears(self):
+        self.seed()
+        data_manager = self.open(compact_every=1)
+        data_manager.add_food(Food("Late snack", 150, self.days[0], "23:00"))
+        self.assertEqual(data_manager.count_food_intake(), 4)
+        data_manager.close()
+        data_manager = self.open()
+        self.assertEqual(data_manager.count_food_intake(), 4)
+        self.assertEqual([f.name for f in data_manager.get_food_intake_page(0, 2)],
+                         [f"Soup {self.days[0]}", "Late snack"])
+        data_manager.clear_exercises()
+        data_manager.save_data()
+        data_manager.close()
+        data_manager = self.open()
+        self.assertEqual(data_manager.count_exercises(), 0)
+        self.assertEqual(data_manager.count_food_intake(), 4)
+        self.assertEqual(len(os.listdir(self.data_file + ".days")), 3)
+        data_manager.close()
+
+    def test_journal_replays_over_segments(self):
+        self.seed()
+        data_manager = self.open()
+        data_manager.add_food(Food("Tea", 5, self.today, "16:00"))
+        data_manager.close()
+        data_manager = self.open()
+        self.assertEqual([f.name for f in data_manager.get_food_intake_page(3, 5)], ["Tea"])
+        self.assertEqual(data_manager.count_food_intake(), 4)
+        data_manager.close()
+
+    def test_migrates_legacy_flat_snapshot(self):
+        legacy = DataManager(self.data_file, storage=JournalStorage(self.data_file))
+        legacy.add_exercise(Exercise("Row", 20, 150, self.days[0], "09:00"))
+        legacy.add_exercise(Exercise("Swim", 45, 400, self.today, "07:00"))
+        legacy.save_data()
+        legacy.close()
+        data_manager = self.open()
+        self.assertEqual(data_manager.count_exercises(), 2)
+        data_manager.add_food(Food("Tea", 5, self.today, "16:00"))
+        data_manager.close()
+        self.assertTrue(os.path.isdir(self.data_file + ".days"))
+        data_manager = self.open()
+        self.assertEqual(data_manager.storage.pending_count("exercises"), 1)
+        self.assertEqual([e.name for e in data_manager.get_exercises_page(0, 2)], ["Row", "Swim"])
+        data_manager.close()
+
+
+class TestDayRollover(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_rollover.json"
+
+    def tearDown(self):
+        remove_data_files(self.data_file, "test_rollover.db")
+
+    def test_startup_rolls_stale_date_forward(self):
+        with open(self.data_file, "w") as f:
+            json.dump(dict(DataManager.default_data(), current_date="01/01/2020"), f)
+        data_manager = DataManager(self.data_file)
+        self.assertEqual(data_manager.get_current_date(), datetime.now().strftime("%d/%m/%Y"))
+
+    def test_today_totals_follow_rollover(self):
+        data_manager = DataManager(self.data_file, storage=JournalStorage(self.data_file))
+        data_manager.roll_over("01/03/2025")
+        data_manager.add_exercise(Exercise("Run", 30, 300, "01/03/2025", "08:00"))
+        data_manager.add_exercise(Exercise("Old", 30, 50, "28/02/2025", "08:00"))
+        data_manager.add_food(Food("Soup", 200, "01/03/2025", "12:00"))
+        self.assertEqual(data_manager.get_today_calories_burned(), 300)
+        self.assertEqual(data_manager.get_today_calories_intake(), 200)
+        self.assertEqual(data_manager.get_total_calories_burned(), 350)
+        data_manager.add_exercise(Exercise("Walk", 10, 40, "01/03/2025", "18:00"))
+        self.assertEqual(data_manager.get_today_calories_burned(), 340)
+        self.assertFalse(data_manager.roll_over("01/03/2025"))
+        self.assertTrue(data_manager.roll_over("02/03/2025"))
+        self.assertEqual(data_manager.get_today_calories_burned(), 0)
+        data_manager.close()
+        reloaded = DataManager(self.data_file, storage=JournalStorage(self.data_file))
+        self.assertEqual(reloaded.get_current_date(), datetime.now().strftime("%d/%m/%Y"))
+        reloaded.close()
+
+    def test_sqlite_today_totals(self):
+        data_manager = SQLiteDataManager("test_rollover.db")
+        data_manager.roll_over("01/03/2025")
+        data_manager.add_exercise(Exercise("Run", 30, 300, "01/03/2025", "08:00"))
+        data_manager.add_exercise(Exercise("Old", 30, 50, "28/02/2025", "08:00"))
+        self.assertEqual(data_manager.get_today_calories_burned(), 300)
+        self.assertEqual(data_manager.get_today_calories_intake(), 0)
+        self.assertTrue(data_manager.roll_over("02/03/2025"))
+        self.assertEqual(data_manager.get_today_calories_burned(), 0)
+        data_manager.close()
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_names.json"
+
+    def tearDown(self):
+        remove_data_files(self.data_file)
+
+    def test_ranks_prefix_matches_by_frequency_then_recency(self):
+        index = NameIndex.from_records({"name": name} for name in ["Running", "Rowing", "Running", "Ride", "Yoga"])
+        self.assertEqual(index.suggest("r"), ["Running", "Ride", "Rowing"])
+        self.assertEqual(index.suggest("RO"), ["Rowing"])
+        self.assertEqual(index.suggest("ru", limit=1), ["Running"])
+        self.assertEqual(index.suggest("x"), [])
+        index.add({"name": "Rowing"})
+        index.add({"name": "rowing "})
+        self.assertEqual(index.suggest("r"), ["rowing", "Running", "Ride"])
+        index.add({"name": "Rugby"})
+        self.assertEqual(index.suggest("ru"), ["Running", "Rugby"])
+        self.assertEqual(len(index), 5)
+
+    def test_normalizes_case_and_spacing(self):
+        index = NameIndex()
+        for name in ("Chicken  Salad", "chicken salad", " CHICKEN SALAD", "", 42):
+            index.add({"name": name, "calories": 350})
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.suggest("chicken s"), ["CHICKEN SALAD"])
+        self.assertEqual(index.last("Chicken salad")["calories"], 350)
+        self.assertIsNone(index.last("Soup"))
+
+    def test_data_manager_keeps_index_current(self):
+        data_manager = DataManager(self.data_file, storage=JournalStorage(self.data_file))
+        data_manager.add_exercise(Exercise("Running", 30, 300, "01/02/2025", "08:00"))
+        data_manager.close()
+        data_manager = DataManager(self.data_file, storage=JournalStorage(self.data_file))
+        self.assertEqual(data_manager.get_name_suggestions("exercises", "ru"), ["Running"])
+        data_manager.add_exercise(Exercise("Running", 45, 420, "02/02/2025", "08:00"))
+        data_manager.bulk_add([Exercise("Rugby", 60, 600, "02/02/2025", "10:00"), Food("Rice", 250, "02/02/2025", "12:00")])
+        self.assertEqual(data_manager.get_name_suggestions("exercises", "ru"), ["Running", "Rugby"])
+        self.assertEqual(data_manager.get_last_entry("exercises", "running"),
+                         {"name": "Running", "duration": 45, "calories": 420})
+        self.assertEqual(data_manager.get_name_suggestions("food_intake", "r"), ["Rice"])
+        data_manager.clear_exercises()
+        self.assertEqual(data_manager.get_name_suggestions("exercises", "ru"), [])
+        self.assertEqual(data_manager.get_name_suggestions("food_intake", "r"), ["Rice"])
+        data_manager.close()
+
+
+    def test_index_is_persisted_and_not_rebuilt_on_open(self):
+        data_manager = DataManager(self.data_file, storage=JournalStorage(self.data_file, compact_every=2))
+        data_manager.add_exercise(Exercise("Running", 30, 300, "01/02/2025", "08:00"))
+        data_manager.add_exercise(Exercise("Rowing", 20, 200, "02/02/2025", "08:00"))
+        data_manager.add_exercise(Exercise("Running", 40, 380, "03/02/2025", "08:00"))
+        data_manager.close()
+        data_manager = DataManager(self.data_file, storage=JournalStorage(self.data_file, compact_every=2))
+        data_manager._iter_records = None
+        self.assertEqual(data_manager.get_name_suggestions("exercises", "r"), ["Running", "Rowing"])
+        self.assertEqual(data_manager.get_last_entry("exercises", "running")["calories"], 380)
+        data_manager.close()
+
+    def test_index_is_built_once_for_older_files(self):
+        data = DataManager.default_data()
+        del data["name_index"]
+        data["food_intake"] = [{"name": "Rice", "calories": 250, "date": "01/02/2025", "timestamp": "12:00"}]
+        with open(self.data_file, "w") as f:
+            json.dump(data, f)
+        data_manager = DataManager(self.data_file)
+        data_manager.add_food(Food("Ramen", 500, "02/02/2025", "12:00"))
+        self.assertNotIn("food_intake", data_manager.data["name_index"])
+        self.assertEqual(data_manager.get_name_suggestions("food_intake", "r"), ["Ramen", "Rice"])
+        self.assertIn("rice", data_manager.data["name_index"]["food_intake"])
+
+class TestDailyTotalsIndex(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_totals.json"
+
+    def tearDown(self):
+        remove_data_files(self.data_file, "test_totals.db")
+
+    def brute_force(self, data_manager, start, end):
+        start, end = datetime.strptime(start, "%d/%m/%Y"), datetime.strptime(end, "%d/%m/%Y")
+        inside = lambda r: start <= datetime.strptime(r.date, "%d/%m/%Y") <= end
+        burned = sum(e.calories for e in data_manager.get_exercises() if inside(e))
+        intake = sum(f.calories for f in data_manager.get_food_intake() if inside(f))
+        return intake - burned
+
+    def test_prefix_sums_follow_appends_in_any_order(self):
+        index = DailyTotalsIndex({})
+        index.add("2025-01-02", burned=100, duration=30)
+        index.add("2025-01-03", intake=500)
+        index.add("2025-01-03", burned=50, duration=10)
+        self.assertFalse(index.dirty)
+        index.add("2025-01-01", intake=200)
+        self.assertTrue(index.dirty)
+        self.assertEqual(index.between("2025-01-01", "2025-01-03"), [150, 700, 40])
+        self.assertEqual(index.between("2025-01-02", "2025-01-02"), [100, 0, 30])
+        self.assertEqual(index.between("2025-02-01", "2025-03-01"), [0, 0, 0])
+        index.clear("exercises")
+        self.assertEqual(sorted(index.totals), ["2025-01-01", "2025-01-03"])
+        self.assertEqual(index.between("2025-01-01", "2025-01-03"), [0, 700, 0])
+
+    def test_range_queries_match_full_scan(self):
+        data_manager = DataManager(self.data_file, storage=JournalStorage(self.data_file))
+        for day in range(1, 29):
+            date = f"{day:02d}/02/2025"
+            data_manager.add_exercise(Exercise("Run", day, day * 10, date, "08:00"))
+            if day % 3:
+                data_manager.add_food(Food("Meal", 100 + day, date, "12:00"))
+        data_manager.add_food(Food("Brunch", 400, "05/02/2025", "11:00"))
+        for start, end in (("01/02/2025", "28/02/2025"), ("05/02/2025", "05/02/2025"), ("10/02/2025", "20/02/2025"),
+                           ("01/01/2025", "03/02/2025"), ("01/03/2025", "31/03/2025")):
+            with self.subTest(start=start, end=end):
+                self.assertAlmostEqual(data_manager.get_net_calories_between(start, end),
+                                       self.brute_force(data_manager, start, end))
+        totals = data_manager.get_totals_between("01/02/2025", "02/02/2025")
+        self.assertEqual(totals, {"burned": 30, "intake": 203, "duration": 3, "net": 173})
+        rows = data_manager.get_daily_totals("04/02/2025", "05/02/2025")
+        self.assertEqual([row["date"] for row in rows], ["04/02/2025", "05/02/2025"])
+        self.assertEqual(rows[1]["intake"], 505)
+        with self.assertRaises(ValueError):
+            data_manager.get_totals_between("2025-02-01", "28/02/2025")
+        data_manager.close()
+
+    def test_index_is_persisted_and_follows_clears(self):
+        data_manager = DataManager(self.data_file, storage=JournalStorage(self.data_file, compact_every=3))
+        data_manager.add_exercise(Exercise("Run", 30, 300, "01/02/2025", "08:00"))
+        data_manager.add_food(Food("Soup", 200, "01/02/2025", "12:00"))
+        data_manager.add_food(Food("Tea", 5, "02/02/2025", "16:00"))
+        data_manager.add_food(Food("Cake", 350, "02/02/2025", "17:00"))
+        data_manager.close()
+        with open(self.data_file) as f:
+            self.assertEqual(json.load(f)["daily_totals"], {"2025-02-01": [300, 200, 30], "2025-02-02": [0, 5, 0]})
+        reloaded = DataManager(self.data_file, storage=JournalStorage(self.data_file))
+        self.assertEqual(reloaded.get_net_calories_between("01/02/2025", "02/02/2025"), 255)
+        reloaded.clear_food()
+        self.assertEqual(reloaded.get_totals_between("01/02/2025", "02/02/2025")["intake"], 0)
+        reloaded.close()
+
+    def test_index_is_built_once_for_older_files(self):
+        data = DataManager.default_data()
+        del data["daily_totals"]
+        data["exercises"] = [{"name": "Run", "duration": 30, "calories": 300, "date": "01/02/2025", "timestamp": "08:00"}]
+        with open(self.data_file, "w") as f:
+            json.dump(data, f)
+        data_manager = DataManager(self.data_file)
+        data_manager.add_exercise(Exercise("Walk", 20, 100, "03/02/2025", "08:00"))
+        self.assertNotIn("daily_totals", data_manager.data)
+        self.assertEqual(data_manager.get_totals_between("01/02/2025", "03/02/2025")["burned"], 400)
+        data_manager.add_exercise(Exercise("Swim", 20, 250, "03/02/2025", "09:00"))
+        self.assertEqual(data_manager.data["daily_totals"]["2025-02-03"], [350, 0, 40])
+
+    def test_recent_totals_and_sqlite_parity(self):
+        today = datetime.now()
+        days = [(today - timedelta(days=n)).strftime("%d/%m/%Y") for n in (0, 6, 7, 40)]
+        managers = [DataManager(self.data_file), SQLiteDataManager("test_totals.db")]
+        for data_manager in managers:
+            for n, day in enumerate(days):
+                data_manager.add_exercise(Exercise("Run", 10, 100 * (n + 1), day, "08:00"))
+                data_manager.add_food(Food("Meal", 1000, day, "12:00"))
+        json_manager, sqlite_manager = managers
+        self.assertEqual(json_manager.get_recent_totals(7), {"burned": 300, "intake": 2000, "duration": 20, "net": 1700})
+        self.assertEqual(json_manager.get_recent_totals(30)["burned"], 600)
+        for start, end in ((days[3], days[0]), (days[2], days[1])):
+            self.assertEqual(json_manager.get_totals_between(start, end), sqlite_manager.get_totals_between(start, end))
+            self.assertEqual(json_manager.get_daily_totals(start, end), sqlite_manager.get_daily_totals(start, end))
+        self.assertEqual(sqlite_manager.get_recent_totals(7), json_manager.get_recent_totals(7))
+        for data_manager in managers:
+            with self.assertRaises(ValueError):
+                data_manager.get_recent_totals(99999999)
+        sqlite_manager.close()
+
+
+class TestBinaryStorage(unittest.TestCase):
+    def setUp(self):
+        self.json_file = "test_binary_source.json"
+        self.data_file = "test_binary_data.bin"
+        source = DataManager(data_file=self.json_file)
+        source.data["current_date"] = "03/01/2025"
+        source.bulk_add([
+            Exercise("Run", 30, 300, "01/01/2025", "07:00"),
+            Exercise("Swim", 45.5, 410.25, "02/01/2025", "08:00"),
+            Exercise("Run", 20, 200, "03/01/2025", "07:30"),
+            Food("Oats", 300, "02/01/2025", "09:00"),
+            Food("Soup", 250, "03/01/2025", "19:00"),
+        ])
+        source.save_data()
+        with open(self.json_file) as f:
+            data = json.load(f)
+        data["exercises"].insert(0, {"name": "Legacy", "calories": "12", "date": None})
+        with open(self.json_file, "w") as f:
+            json.dump(data, f)
+        convert_snapshot(self.json_file, self.data_file)
+
+    def tearDown(self):
+        remove_data_files(self.json_file, self.data_file)
+
+    def test_round_trip_to_json_is_lossless(self):
+        convert_snapshot(self.data_file, "test_binary_copy.json")
+        try:
+            with open(self.json_file) as f:
+                original = json.load(f)
+            with open("test_binary_copy.json") as f:
+                self.assertEqual(json.load(f), original)
+        finally:
+            remove_data_files("test_binary_copy.json")
+
+    def test_lazy_load_reads_only_current_day(self):
+        data_manager = DataManager(storage=BinaryStorage(self.data_file))
+        self.assertEqual(len(data_manager.data["exercises"]), 1)
+        self.assertEqual(len(data_manager.data["food_intake"]), 1)
+        self.assertTrue(data_manager.has_pending_history())
+        self.assertEqual(data_manager.count_exercises(), 4)
+        self.assertEqual(data_manager.get_total_calories_burned(), 910.25)
+        self.assertEqual([e.name for e in data_manager.get_exercises_page(3, 10)], ["Run"])
+        self.assertTrue(data_manager.has_pending_history())
+        self.assertEqual([e.name for e in data_manager.get_exercises()], ["Legacy", "Run", "Swim", "Run"])
+        self.assertFalse(data_manager.has_pending_history())
+
+    def test_save_keeps_unloaded_history(self):
+        data_manager = DataManager(storage=BinaryStorage(self.data_file))
+        data_manager.add_food(Food("Tea", 5, "03/01/2025", "20:00"))
+        reopened = DataManager(storage=BinaryStorage(self.data_file, lazy=False))
+        self.assertEqual([f.name for f in reopened.get_food_intake()], ["Oats", "Soup", "Tea"])
+        self.assertEqual(reopened.count_exercises(), 4)
+
+    def test_clear_discards_unloaded_history(self):
+        data_manager = DataManager(storage=BinaryStorage(self.data_file))
+        data_manager.clear_exercises()
+        self.assertEqual(data_manager.count_exercises(), 0)
+        reopened = DataManager(storage=BinaryStorage(self.data_file, lazy=False))
+        self.assertEqual(reopened.count_exercises(), 0)
+        self.assertEqual(reopened.count_food_intake(), 2)
+
+    def test_mapped_records(self):
+        records = MappedRecords(BinarySnapshot(self.data_file), "exercises")
+        try:
+            self.assertEqual(len(records), 4)
+            self.assertEqual(records[-1].to_dict(), Exercise("Run", 20, 200, "03/01/2025", "07:30").to_dict())
+            self.assertEqual(records[0].name, "Legacy")
+            self.assertEqual([e.duration for e in records[1:3]], [30, 45.5])
+            self.assertEqual([e.name for e in records], ["Legacy", "Run", "Swim", "Run"])
+        finally:
+            records.close()
+
+    def test_history_is_read_through_the_mapping(self):
+        data_manager = DataManager(storage=BinaryStorage(self.data_file))
+        self.assertEqual([e.name for e in data_manager.get_exercises_page(1, 3)], ["Run", "Swim", "Run"])
+        self.assertEqual([f.name for f in data_manager.iter_food_intake()], ["Oats", "Soup"])
+        self.assertEqual(list(data_manager.get_exercise_columns().calories), [0.0, 300.0, 410.25, 200.0])
+        self.assertTrue(data_manager.has_pending_history())
+        data_manager.add_food(Food("Tea", 5, "03/01/2025", "20:00"))
+        self.assertEqual([f.name for f in data_manager.iter_food_intake()], ["Oats", "Soup", "Tea"])
+        data_manager.close()
+
+    def test_binary_journal_storage(self):
+        data_manager = DataManager(storage=BinaryJournalStorage(self.data_file, compact_every=2))
+        data_manager.add_exercise(Exercise("Bike", 60, 500, "03/01/2025", "17:00"))
+        data_manager.close()
+        data_manager = DataManager(storage=BinaryJournalStorage(self.data_file, compact_every=2))
+        self.assertEqual(data_manager.count_exercises(), 5)
+        data_manager.add_exercise(Exercise("Walk", 10, 40, "03/01/2025", "21:00"))
+        data_manager.close()
+        reopened = DataManager(storage=BinaryStorage(self.data_file, lazy=False))
+        self.assertEqual([e.name for e in reopened.get_exercises()][-2:], ["Bike", "Walk"])
+        self.assertEqual(reopened.get_total_calories_burned(), 1450.25)
+
+class TestDataExporter(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager(data_file="test_export_data.json")
+        self.data_manager.reset_all()
+        self.data_manager.add_exercise(Exercise('Squats, "heavy"', 20, 150, "01/01/2025", "08:00"))
+        self.data_manager.add_food(Food("Toast", 120, "01/01/2025", "09:00"))
+
+    def tearDown(self):
+        remove_data_files("test_export_data.json", "test_export.csv")
+
+    def read_rows(self, filename):
+        import csv
+        import gzip
+        opener = gzip.open if filename.endswith(".gz") else open
+        with opener(filename, "rt", newline="") as f:
+            return list(csv.reader(f))
+
+    def test_names_with_commas_and_quotes_survive(self):
+        count = DataExporter.export_csv(self.data_manager, "test_export.csv")
+        rows = self.read_rows("test_export.csv")
+        self.assertEqual(count, 2)
+        self.assertEqual(rows[0], DataExporter.HEADER)
+        self.assertEqual(rows[1][3], 'Squats, "heavy"')
+        self.assertEqual(rows[2], ["Food", "01/01/2025", "09:00", "Toast", "", "120"])
+
+    def test_gzip_output_and_progress(self):
+        for i in range(5):
+            self.data_manager.add_food(Food(f"Snack {i}", 50, "02/01/2025", "10:00"))
+        progress = []
+        DataExporter.export_csv(self.data_manager, "test_export.csv.gz", chunk_size=3,
+                                progress=lambda done, total: progress.append((done, total)))
+        rows = self.read_rows("test_export.csv.gz")
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(progress[-1], (7, 7))
+        self.assertEqual([done for done, _ in progress], [3, 6, 7])
+
+class TestSQLiteDataManager(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_exercise_data.db"
+        self.data_manager = SQLiteDataManager(data_file=self.data_file)
+        self.data_manager.reset_all()
+
+    def tearDown(self):
+        self.data_manager.close()
+        remove_data_files(self.data_file)
+
+    def test_add_and_reopen(self):
+        self.data_manager.add_exercise(Exercise("Swim", 45, 400, "02/01/2025", "07:30"))
+        self.data_manager.add_food(Food("Rice", 250, "02/01/2025", "12:00"))
+        self.data_manager.close()
+        self.data_manager = SQLiteDataManager(data_file=self.data_file)
+        exercises = self.data_manager.get_exercises()
+        self.assertEqual(len(exercises), 1)
+        self.assertEqual(exercises[0].duration, 45)
+        self.assertEqual(self.data_manager.get_food_intake()[0].name, "Rice")
+        self.assertEqual(self.data_manager.get_total_calories_burned(), 400)
+        self.assertEqual(self.data_manager.get_total_calories_intake(), 250)
+
+    def test_range_queries(self):
+        for day in ("30/12/2024", "01/01/2025", "15/01/2025", "01/02/2025"):
+            self.data_manager.add_exercise(Exercise(f"Walk {day}", 20, 100, day, "18:00"))
+        found = self.data_manager.get_exercises_between("01/01/2025", "31/01/2025")
+        self.assertEqual([e.date for e in found], ["01/01/2025", "15/01/2025"])
+        self.assertEqual(self.data_manager.get_food_intake_between("01/01/2025", "31/01/2025"), [])
+        page, total = self.data_manager.get_exercises_between_page("01/01/2025", "31/01/2025", 1, 10)
+        self.assertEqual(([e.date for e in page], total), (["15/01/2025"], 2))
+        with self.assertRaises(ValueError):
+            self.data_manager.get_exercises_between("2025-01-01", "31/01/2025")
+
+    def test_clear_exercises_keeps_food(self):
+        self.data_manager.add_exercise(Exercise("Row", 10, 80, "01/01/2025", "06:00"))
+        self.data_manager.add_food(Food("Egg", 70, "01/01/2025", "06:30"))
+        self.data_manager.clear_exercises()
+        self.assertEqual(len(self.data_manager.get_exercises()), 0)
+        self.assertEqual(len(self.data_manager.get_food_intake()), 1)
+        self.assertEqual(self.data_manager.get_total_calories_burned(), 0)
+        self.assertEqual(self.data_manager.get_total_calories_intake(), 70)
+
+class TestCalorieNeedsService(unittest.TestCase):
+    def tearDown(self):
+        remove_data_files("test_target.json", "test_target.db")
+
+    def test_scalar_matches_harris_benedict(self):
+        male = CalorieNeedsService.calculate_daily_calories("30", "Male", "80", "180", "Very Active")
+        self.assertAlmostEqual(male, (88.362 + 13.397 * 80 + 4.799 * 180 - 5.677 * 30) * 1.725)
+        female = CalorieNeedsService.calculate_daily_calories(40, "Female", 60, 165, "Unknown")
+        self.assertAlmostEqual(female, (447.593 + 9.247 * 60 + 3.098 * 165 - 4.330 * 40) * 1.2)
+
+    def test_scalar_rejects_invalid_profiles(self):
+        for profile in (("", "Male", 80, 180, "Sedentary"), (30, "Male", "abc", 180, "Sedentary"),
+                        (30, "Male", 80, -180, "Sedentary"), (0, "Female", 60, 165, "Sedentary"),
+                        (200, "Male", 1, 1, "Sedentary")):
+            with self.subTest(profile=profile), self.assertRaises(ValueError):
+                CalorieNeedsService.calculate_daily_calories(*profile)
+
+    def test_repeated_profiles_are_memoized(self):
+        CalorieNeedsService.calculate_daily_calories.cache_clear()
+        for _ in range(3):
+            CalorieNeedsService.calculate_daily_calories(25, "Male", 70, 175, "Sedentary")
+        info = CalorieNeedsService.calculate_daily_calories.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_batch_masks_invalid_rows(self):
+        calories, valid = CalorieNeedsService.calculate_daily_calories_batch(
+            [30, "x", 30, 40, 200], ["Male", "Male", "Male", "Female", "Male"], [80, 80, 80, 60, 1],
+            [180, 180, 180, 165, 1], ["Very Active", "Very Active", "Very Active", "Sedentary", "Sedentary"]
+        )
+        self.assertEqual(list(valid), [1, 0, 1, 1, 0])
+        self.assertEqual(calories[0], calories[2])
+        self.assertAlmostEqual(calories[3], CalorieNeedsService.calculate_daily_calories(40, "Female", 60, 165, "Sedentary"))
+        with self.assertRaises(ValueError):
+            CalorieNeedsService.calculate_daily_calories_batch([30], ["Male"], [80], [180, 170], ["Sedentary"])
+
+    def test_data_manager_derives_and_persists_target(self):
+        data_manager = DataManager("test_target.json", storage=JournalStorage("test_target.json"))
+        target = data_manager.derive_target_calories(30, "Male", 80, 180, "Sedentary")
+        data_manager.close()
+        self.assertEqual(target, round(CalorieNeedsService.calculate_daily_calories(30, "Male", 80, 180, "Sedentary")))
+        reloaded = DataManager("test_target.json", storage=JournalStorage("test_target.json"))
+        self.assertEqual(reloaded.get_target_calories(), target)
+        self.assertEqual(reloaded.get_activity_level(), "Sedentary")
+        reloaded.close()
+        with self.assertRaises(ValueError):
+            reloaded.derive_target_calories("x", "Male", 80, 180, "Sedentary")
+        with self.assertRaises(ValueError):
+            reloaded.derive_target_calories(200, "Male", 1, 1, "Sedentary")
+        self.assertEqual(reloaded.get_target_calories(), target)
+
+    def test_sqlite_derives_target(self):
+        data_manager = SQLiteDataManager("test_target.db")
+        target = data_manager.derive_target_calories(30, "Female", 60, 165, "Lightly Active")
+        self.assertEqual(data_manager.get_target_calories(), target)
+        self.assertEqual(data_manager.get_activity_level(), "Lightly Active")
+        data_manager.close()
+
+
+class TestCalorieEstimator(unittest.TestCase):
+    def tearDown(self):
+        remove_data_files("test_weight.json", "test_weight.db", "test_catalog.csv")
+
+    def test_catalog_loads_lazily_and_matches_names(self):
+        with open("test_catalog.csv", "w") as f:
+            f.write("activity,met\nRunning,9.8\nWalking Brisk,4.3\nwalking,3.5\nWeight Lifting,3.5\n")
+        catalog = METCatalog("test_catalog.csv")
+        self.assertIsNone(catalog._values)
+        self.assertEqual(catalog.met("running"), 9.8)
+        self.assertEqual(catalog.met("  Morning RUNNING "), 9.8)
+        self.assertEqual(catalog.met("brisk walking"), 4.3)
+        self.assertEqual(catalog.met("Weight-lifting"), 3.5)
+        self.assertIsNone(catalog.met("Chess"))
+        self.assertIsNone(catalog.met(None))
+        catalog.met("Morning running")
+        self.assertEqual(catalog._find.cache_info().hits, 1)
+
+    def test_bundled_catalog_estimates(self):
+        self.assertAlmostEqual(CalorieEstimator.estimate("Running", 30, 80), 9.8 * 80 * 0.5)
+        self.assertAlmostEqual(CalorieEstimator.estimate("Yoga", "60"), 2.5 * CalorieEstimator.DEFAULT_WEIGHT_KG)
+        self.assertIsNone(CalorieEstimator.estimate("Chess", 30, 80))
+        self.assertIsNone(CalorieEstimator.estimate("Running", "", 80))
+
+    def test_batch_matches_scalar_and_masks_unknowns(self):
+        names = ["Running", "Chess", "swimming", "Yoga", None]
+        durations = [30, 30, "45", -10, 20]
+        calories, valid = CalorieEstimator.estimate_batch(names, durations, 70)
+        self.assertEqual(list(valid), [1, 0, 1, 0, 0])
+        self.assertAlmostEqual(calories[0], CalorieEstimator.estimate("Running", 30, 70))
+        self.assertAlmostEqual(calories[2], CalorieEstimator.estimate("swimming", 45, 70))
+
+    def test_weight_is_persisted(self):
+        data_manager = DataManager("test_weight.json", storage=JournalStorage("test_weight.json"))
+        self.assertIsNone(data_manager.get_weight())
+        data_manager.set_weight("72.5")
+        with self.assertRaises(ValueError):
+            data_manager.set_weight("heavy")
+        data_manager.close()
+        data_manager = DataManager("test_weight.json", storage=JournalStorage("test_weight.json"))
+        self.assertEqual(data_manager.get_weight(), 72.5)
+        data_manager.derive_target_calories(30, "Male", 80, 180, "Sedentary")
+        self.assertEqual(data_manager.get_weight(), 80)
+        data_manager.close()
+        sqlite_manager = SQLiteDataManager("test_weight.db")
+        sqlite_manager.set_weight(64)
+        self.assertEqual(sqlite_manager.get_weight(), 64)
+        sqlite_manager.close()
+
+
+class TestProfileManager(unittest.TestCase):
+    def setUp(self):
+        self.directory = "test_profiles"
+        self.closed = []
+        self.profiles = ProfileManager(self.directory, capacity=2, default_file="test_default.json",
+                                       factory=self.open_data_manager)
+
+    def tearDown(self):
+        self.profiles.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        remove_data_files("test_default.json")
+
+    def open_data_manager(self, path):
+        data_manager = DataManager(path, storage=JournalStorage(path))
+        close = data_manager.close
+        data_manager.close = lambda: (self.closed.append(path), close())
+        return data_manager
+
+    def test_default_factory_locks_each_shard(self):
+        profiles = ProfileManager(self.directory, default_file="test_default.json")
+        try:
+            data_manager = profiles.get("Default")
+            self.assertIsInstance(data_manager.storage.storage, DayPartitionedStorage)
+            with self.assertRaises(OSError):
+                open_data_manager("test_default.json")
+        finally:
+            profiles.close()
+        open_data_manager("test_default.json").close()
+
+    def test_plain_manager_refuses_day_partitioned_file(self):
+        data_manager = open_data_manager("test_default.json")
+        data_manager.add_exercise(Exercise("Run", 30, 300, "01/01/2025", "07:00"))
+        data_manager.save_data()
+        data_manager.close()
+        with self.assertRaises(StorageLayoutError):
+            DataManager("test_default.json")
+        data_manager = open_data_manager("test_default.json")
+        self.assertEqual([e.name for e in data_manager.iter_exercises()], ["Run"])
+        data_manager.close()
+
+    def test_each_profile_has_its_own_shard(self):
+        self.profiles.get("Ann").add_exercise(Exercise("Run", 30, 300, "01/01/2025", "08:00"))
+        self.profiles.get("Bob").add_food(Food("Soup", 200, "01/01/2025", "12:00"))
+        self.assertEqual(self.profiles.get("Ann").count_exercises(), 1)
+        self.assertEqual(self.profiles.get("Ann").count_food_intake(), 0)
+        self.assertEqual(self.profiles.get("Bob").count_food_intake(), 1)
+        self.assertEqual(self.profiles.data_file("Default"), "test_default.json")
+        self.assertNotEqual(self.profiles.data_file("Ann"), self.profiles.data_file("Bob"))
+
+    def test_names_round_trip_through_file_names(self):
+        for name in ("Ann/Lee", "José", "..", "a b"):
+            self.profiles.get(name)
+        self.assertEqual(self.profiles.list_profiles(), ["Default", "..", "a b", "Ann/Lee", "José"])
+        for name in os.listdir(self.directory):
+            self.assertNotIn("/", name)
+        with self.assertRaises(ValueError):
+            self.profiles.get("   ")
+
+    def test_least_recently_used_profile_is_closed(self):
+        ann = self.profiles.get("Ann")
+        self.profiles.get("Bob")
+        self.assertIs(self.profiles.get("Ann"), ann)
+        ann.add_exercise(Exercise("Run", 30, 300, "01/01/2025", "08:00"))
+        self.profiles.get("Cleo")
+        self.assertEqual(self.profiles.loaded(), ["Ann", "Cleo"])
+        self.assertEqual(self.closed, [self.profiles.data_file("Bob")])
+        self.profiles.get("Dan")
+        self.assertEqual(self.closed[-1], self.profiles.data_file("Ann"))
+        self.assertEqual(self.profiles.get("Ann").get_exercises()[0].name, "Run")
+        self.assertIn("Bob", self.profiles.list_profiles())
+
+    def test_close_flushes_every_open_profile(self):
+        self.profiles.get("Ann")
+        self.profiles.get("Default")
+        self.profiles.close()
+        self.assertEqual(self.profiles.loaded(), [])
+        self.assertEqual(len(self.closed), 2)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.data_file = "test_instrumented.json"
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+        remove_data_files(self.data_file)
+
+    def test_disabled_leaves_methods_untouched(self):
+        original = DataManager.__dict__["get_exercises"]
+        instrumentation.enable()
+        self.assertIsNot(DataManager.__dict__["get_exercises"], original)
+        instrumentation.disable()
+        self.assertIs(DataManager.__dict__["get_exercises"], original)
+        DataManager(data_file=self.data_file).get_exercises()
+        self.assertEqual(instrumentation.snapshot()["timings"], {})
+
+    def test_records_counts_timings_and_files(self):
+        instrumentation.enable()
+        data_manager = DataManager(data_file=self.data_file, storage=JournalStorage(self.data_file))
+        data_manager.add_exercise(Exercise("Run", 30, 300, "01/01/2025", "08:00"))
+        data_manager.add_food(Food("Soup", 200, "01/01/2025", "12:00"))
+        data_manager.get_exercises()
+        data_manager.get_exercises()
+        data_manager.save_data()
+        snapshot = instrumentation.snapshot(data_manager)
+        data_manager.close()
+        timings = snapshot["timings"]
+        self.assertEqual(timings["DataManager.get_exercises"]["count"], 2)
+        self.assertEqual(timings["DataManager.load_data"]["count"], 1)
+        self.assertEqual(timings["DataManager.save_data"]["count"], 1)
+        self.assertEqual(timings["DataManager._commit"]["count"], 2)
+        self.assertGreaterEqual(timings["DataManager.get_exercises"]["max_s"], timings["DataManager.get_exercises"]["mean_s"])
+        self.assertEqual(snapshot["records"], {"exercises": 1, "food_intake": 1})
+        self.assertIn(self.data_file, snapshot["files"])
+
+    def test_files_include_day_segments(self):
+        data_manager = open_data_manager(self.data_file, background=True)
+        data_manager.add_exercise(Exercise("Run", 30, 300, "01/01/2025", "08:00"))
+        data_manager.add_exercise(Exercise("Swim", 30, 200, "02/01/2025", "08:00"))
+        data_manager.save_data()
+        data_manager.flush()
+        files = instrumentation.data_files(data_manager)
+        data_manager.close()
+        segment_dir = self.data_file + ".days"
+        self.assertEqual(files[segment_dir], sum(os.path.getsize(os.path.join(segment_dir, name))
+                                                 for name in os.listdir(segment_dir)))
+        self.assertGreater(files[segment_dir], 0)
+
+    def test_watch_while_enabled_and_dump(self):
+        class Probe:
+            def work(self):
+                return 42
+
+        local = Instrumentation()
+        local.enable(dump_file=self.data_file)
+        local.watch(Probe, "work")
+        self.assertEqual(Probe().work(), 42)
+        local.dump(local.dump_file)
+        with open(self.data_file) as f:
+            self.assertEqual(json.load(f)["timings"]["Probe.work"]["count"], 1)
+        local.disable()
+        self.assertEqual(Probe.work.__name__, "work")
+        self.assertNotIn("__wrapped__", vars(Probe.work))
+
+
 if __name__ == "__main__":
     unittest.main()
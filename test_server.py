@@ -0,0 +1,218 @@
+import asyncio
+import json
+import unittest
+
+from datetime import datetime, timedelta
+
+from core import Exercise, Food, SQLiteDataManager, open_data_manager
+from server import ServerThread, TrackerServer, main
+from test_main import remove_data_files
+
+
+async def request(port, method, path, body=None, raw=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = raw if raw is not None else b"" if body is None else json.dumps(body).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n"
+                 f"Connection: close\r\n\r\n".encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+class TestTrackerServer(unittest.IsolatedAsyncioTestCase):
+    data_file = "test_server_data.json"
+
+    def open_manager(self):
+        return open_data_manager(self.data_file)
+
+    async def asyncSetUp(self):
+        self.data_manager = self.open_manager()
+        self.server = await TrackerServer(self.data_manager, port=0).start()
+
+    async def asyncTearDown(self):
+        await self.server.close(close_data_manager=True)
+        remove_data_files(self.data_file)
+
+    async def test_add_and_list_pages(self):
+        status, body = await request(self.server.port, "POST", "/exercises",
+                                     [{"name": f"Run {i}", "duration": 30, "calories": 100 + i,
+                                       "date": "01/01/2025", "timestamp": "07:00"} for i in range(5)])
+        self.assertEqual((status, body), (201, {"added": 5}))
+        status, page = await request(self.server.port, "GET", "/exercises?offset=3&limit=10")
+        self.assertEqual(status, 200)
+        self.assertEqual([item["name"] for item in page["items"]], ["Run 3", "Run 4"])
+        self.assertEqual((page["total"], page["next_offset"]), (5, None))
+        _, page = await request(self.server.port, "GET", "/exercises?limit=2")
+        self.assertEqual(page["next_offset"], 2)
+        status, body = await request(self.server.port, "POST", "/food", {"name": "Rice", "calories": 200})
+        self.assertEqual(status, 201)
+        _, page = await request(self.server.port, "GET", "/food")
+        self.assertEqual(page["items"][0]["date"], self.data_manager.get_current_date())
+
+    async def test_concurrent_posts_are_serialized_and_batched(self):
+        async def post(i):
+            return await request(self.server.port, "POST", "/records",
+                                 {"type": "Food", "name": f"Snack {i}", "calories": 10, "date": "01/01/2025"})
+        results = await asyncio.gather(*(post(i) for i in range(40)))
+        self.assertEqual({status for status, _ in results}, {201})
+        self.assertEqual(self.server.stats["records"], 40)
+        self.assertLessEqual(self.server.stats["batches"], 40)
+        await self.server.close(close_data_manager=True)
+        data_manager = self.open_manager()
+        self.assertEqual(data_manager.count_food_intake(), 40)
+        self.assertEqual(data_manager.get_total_calories_intake(), 400)
+        data_manager.close()
+
+    async def test_range_and_totals(self):
+        self.data_manager.bulk_add([Exercise("Run", 30, 300, "01/01/2025", "07:00"),
+                                    Exercise("Swim", 30, 200, "01/03/2025", "07:00")])
+        status, page = await request(self.server.port, "GET", "/exercises?start=01/02/2025&end=01/05/2025")
+        self.assertEqual((status, [item["name"] for item in page["items"]]), (200, ["Swim"]))
+        _, page = await request(self.server.port, "GET", "/exercises?start=01/01/2025&end=31/03/2025&offset=1&limit=1")
+        self.assertEqual(([item["name"] for item in page["items"]], page["total"], page["next_offset"]), (["Swim"], 2, None))
+        _, page = await request(self.server.port, "GET", "/exercises?start=01/01/2025&end=31/03/2025&limit=1")
+        self.assertEqual(([item["name"] for item in page["items"]], page["next_offset"]), (["Run"], 1))
+        status, totals = await request(self.server.port, "GET", "/totals?start=01/01/2025&end=31/03/2025")
+        self.assertEqual((status, totals["burned"], totals["net"]), (200, 500, -500))
+        _, daily = await request(self.server.port, "GET", "/totals/daily?start=01/01/2025&end=31/03/2025")
+        self.assertEqual([day["date"] for day in daily["days"]], ["01/01/2025", "01/03/2025"])
+        _, summary = await request(self.server.port, "GET", "/totals")
+        self.assertEqual((summary["burned"], summary["target"]), (500, self.data_manager.get_target_calories()))
+
+    async def test_rolls_over_to_a_new_day(self):
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%d/%m/%Y")
+        today = datetime.now().strftime("%d/%m/%Y")
+        self.data_manager.roll_over(yesterday)
+        _, summary = await request(self.server.port, "GET", "/totals")
+        self.assertEqual(summary["date"], today)
+        self.data_manager.roll_over(yesterday)
+        status, _ = await request(self.server.port, "POST", "/food", {"name": "Rice", "calories": 200})
+        self.assertEqual(status, 201)
+        self.assertEqual(self.data_manager.get_food_intake()[0].date, today)
+        self.assertEqual(self.data_manager.get_today_calories_intake(), 200)
+
+    async def test_missing_calories_are_estimated(self):
+        self.data_manager.set_weight(80)
+        status, _ = await request(self.server.port, "POST", "/exercises", {"name": "Running", "duration": 30})
+        self.assertEqual(status, 201)
+        self.assertEqual(self.data_manager.get_exercises()[0].calories, 392.0)
+
+    async def test_errors(self):
+        port = self.server.port
+        status, body = await request(port, "POST", "/exercises", [{"name": "Run", "duration": 30, "calories": 90},
+                                                                   {"name": "Lift", "duration": -1, "calories": 50}])
+        self.assertEqual(status, 400)
+        self.assertIn("Record 2", body["error"])
+        self.assertEqual(self.data_manager.count_exercises(), 0)
+        self.assertEqual((await request(port, "POST", "/food", raw=b"{oops"))[0], 400)
+        for when in ({"date": 12345}, {"date": "2025-01-01"}, {"date": None}, {"date": "31/02/2025"},
+                     {"timestamp": "25:99"}, {"timestamp": ""}):
+            status, body = await request(port, "POST", "/food", dict(when, name="Rice", calories=200))
+            self.assertEqual(status, 400, when)
+            self.assertIn("Record 1", body["error"])
+        self.assertEqual(self.data_manager.count_food_intake(), 0)
+        self.assertEqual((await request(port, "GET", "/exercises?limit=abc"))[0], 400)
+        self.assertEqual((await request(port, "GET", "/exercises?start=foo"))[0], 400)
+        self.assertEqual((await request(port, "GET", "/food?start=01/01/2025&end=31-01-2025"))[0], 400)
+        self.assertEqual((await request(port, "GET", "/totals?start=2025-01-01"))[0], 400)
+        status, totals = await request(port, "GET", "/totals?days=99999999")
+        self.assertEqual((status, totals["burned"]), (200, 0))
+        self.assertEqual((await request(port, "GET", "/totals?days=0"))[0], 400)
+        self.assertEqual((await request(port, "DELETE", "/totals"))[0], 405)
+        self.assertEqual((await request(port, "GET", "/nowhere"))[0], 404)
+        self.server.max_body = 10
+        self.assertEqual((await request(port, "POST", "/food", {"name": "Rice", "calories": 200}))[0], 413)
+
+    async def test_serves_day_partitioned_history(self):
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%d/%m/%Y")
+        self.data_manager.add_exercise(Exercise("Run", 30, 300, yesterday, "07:00"))
+        self.data_manager.add_food(Food("Soup", 250, self.data_manager.get_current_date(), "12:00"))
+        self.data_manager.save_data()
+        await self.server.close(close_data_manager=True)
+        self.data_manager = self.open_manager()
+        self.assertTrue(self.data_manager.has_pending_history())
+        self.server = await TrackerServer(self.data_manager, port=0).start()
+        _, page = await request(self.server.port, "GET", "/exercises")
+        self.assertEqual([item["name"] for item in page["items"]], ["Run"])
+        status, _ = await request(self.server.port, "POST", "/exercises", {"name": "Swim", "duration": 20, "calories": 150})
+        self.assertEqual(status, 201)
+        _, page = await request(self.server.port, "GET", "/exercises")
+        self.assertEqual([item["name"] for item in page["items"]], ["Run", "Swim"])
+
+    def test_refuses_a_data_file_in_use(self):
+        self.assertEqual(main(["--data-file", self.data_file, "--port", "0"]), 1)
+
+    async def test_keep_alive_connection(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        for _ in range(2):
+            writer.write(b"GET /totals HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+            self.assertEqual(json.loads(await reader.readexactly(length))["burned"], 0)
+        writer.close()
+
+
+class TestServerThread(unittest.TestCase):
+    data_file = "test_server_thread.json"
+    other_file = "test_server_other.json"
+
+    def setUp(self):
+        self.data_manager = open_data_manager(self.data_file, background=True)
+        self.thread = ServerThread(self.data_manager, port=0).start()
+
+    def tearDown(self):
+        self.thread.stop()
+        self.data_manager.close()
+        remove_data_files(self.data_file, self.other_file)
+
+    def test_shares_the_host_data_manager(self):
+        self.data_manager.add_food(Food("Toast", 120, "01/01/2025", "08:00"))
+        status, _ = asyncio.run(request(self.thread.port, "POST", "/food", {"name": "Soup", "calories": 250}))
+        self.assertEqual(status, 201)
+        self.assertEqual([f.name for f in self.data_manager.get_food_intake()], ["Toast", "Soup"])
+        _, page = asyncio.run(request(self.thread.port, "GET", "/food"))
+        self.assertEqual(page["total"], 2)
+        self.thread.stop()
+        self.thread.stop()
+        self.assertEqual(self.data_manager.count_food_intake(), 2)
+
+    def test_follows_a_profile_switch(self):
+        other = open_data_manager(self.other_file)
+        try:
+            self.thread.set_data_manager(other)
+            status, _ = asyncio.run(request(self.thread.port, "POST", "/exercises",
+                                            {"name": "Row", "duration": 10, "calories": 80}))
+            self.assertEqual(status, 201)
+            self.assertEqual((other.count_exercises(), self.data_manager.count_exercises()), (1, 0))
+            self.thread.stop()
+        finally:
+            other.close()
+
+    def test_reports_a_port_in_use(self):
+        with self.assertRaises(OSError):
+            ServerThread(self.data_manager, port=self.thread.port).start()
+
+
+class TestSQLiteTrackerServer(unittest.IsolatedAsyncioTestCase):
+    async def test_sqlite_manager_stays_on_one_thread(self):
+        server = TrackerServer(None, port=0)
+        server.data_manager = await server.call(SQLiteDataManager, "test_server_data.db")
+        await server.start()
+        try:
+            status, _ = await request(server.port, "POST", "/food", {"name": "Rice", "calories": 200})
+            self.assertEqual(status, 201)
+            _, page = await request(server.port, "GET", "/food")
+            self.assertEqual(page["total"], 1)
+            await server.close()
+            self.assertIsNone(server._executor)
+            server.data_manager = None
+        finally:
+            await server.close(close_data_manager=True)
+            remove_data_files("test_server_data.db")
+
+
+if __name__ == "__main__":
+    unittest.main()